@@ -18,6 +18,8 @@ from routes.layered import layered_bp
 from routes.layered_image import layered_image_bp
 from routes.auth import auth_bp
 from routes.advanced_layered import advanced_layered_bp
+from services.database_service import DatabaseService
+from services.layered_service import check_aes_throughput
 
 def create_app():
     """Create and configure the Flask application"""
@@ -29,6 +31,17 @@ def create_app():
     # Initialize app with configuration
     Config.init_app(app)
     
+    # Create the users table once per application, not on every module import
+    DatabaseService.init_database()
+    
+    # Warn once per process if libcrypto's AES is running without AES-NI
+    check_aes_throughput()
+    
+    @app.cli.command('init-db')
+    def init_db():
+        """Create the users database schema"""
+        DatabaseService.init_database()
+    
     # Enable CORS for all domains on all routes
     CORS(app, origins=[
         "http://localhost:3000", 
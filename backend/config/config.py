@@ -27,7 +27,7 @@ class Config:
     
     # Cryptography constants
     AES_KEY_SIZES = [128, 192, 256]  # bits
-    AES_MODES = ['ECB', 'CBC']
+    AES_MODES = ['ECB', 'CBC', 'CTR', 'GCM']
     RSA_KEY_SIZES = [1024, 2048, 3072, 4096]  # bits
     ECC_CURVES = ['secp256r1', 'secp384r1', 'secp521r1']
     
@@ -64,7 +64,7 @@ def info():
     return jsonify({
         "module": "AES (Advanced Encryption Standard)",
         "supported_key_sizes": [128, 192, 256],
-        "supported_modes": ["ECB", "CBC"],
+        "supported_modes": ["ECB", "CBC", "CTR", "GCM"],
         "endpoints": {
             "/encrypt": "Encrypt plaintext using AES",
             "/decrypt": "Decrypt ciphertext using AES",
@@ -73,15 +73,15 @@ def info():
         "encrypt_parameters": {
             "plaintext": "Text to encrypt (required)",
             "key": "Encryption key (required)",
-            "mode": "AES mode - ECB or CBC (optional, default: CBC)",
+            "mode": "AES mode - ECB, CBC, CTR or GCM (optional, default: CBC)",
             "key_size": "Key size in bits - 128, 192, or 256 (optional, default: 256)",
-            "iv": "IV for CBC mode (optional, will generate if not provided)"
+            "iv": "IV/nonce for CBC, CTR and GCM modes (optional, will generate if not provided)"
         },
         "decrypt_parameters": {
             "ciphertext": "Base64 encoded ciphertext (required)",
             "key": "Decryption key (required)",
-            "mode": "AES mode - ECB or CBC (optional, default: CBC)",
+            "mode": "AES mode - ECB, CBC, CTR or GCM (optional, default: CBC)",
             "key_size": "Key size in bits - 128, 192, or 256 (optional, default: 256)",
-            "iv": "Base64 encoded IV (required for CBC mode)"
+            "iv": "Base64 encoded IV/nonce (required for CBC, CTR and GCM modes)"
         }
     })
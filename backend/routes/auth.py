@@ -184,7 +184,7 @@ def info():
         },
         'security': {
             'password_hashing': 'SHA-256 with random salt',
-            'salt_length': '32 bytes (64 hex characters)',
+            'salt_length': '32 bytes (stored as BLOB)',
             'min_password_length': 6,
             'min_username_length': 3
         }
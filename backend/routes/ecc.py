@@ -58,6 +58,31 @@ def ecdh_shared_secret():
     except Exception as e:
         return jsonify(create_error_response(f"ECDH shared secret calculation failed: {str(e)}")[0]), 500
 
+@ecc_bp.route('/ecdh-shared-secrets-batch', methods=['POST'])
+def ecdh_shared_secrets_batch():
+    """Calculate ECDH shared secrets of one private key against many public keys"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify(create_error_response("No JSON data provided")[0]), 400
+        
+        # Validate required fields
+        required_fields = ['private_key_a', 'public_keys_b']
+        is_valid, error_msg = validate_required_fields(data, required_fields)
+        if not is_valid:
+            return jsonify(create_error_response(error_msg)[0]), 400
+        
+        private_key_a = data['private_key_a']
+        public_keys_b = [(key['x'], key['y']) for key in data['public_keys_b']]
+        curve = data.get('curve', 'brainpoolP256r1')
+        
+        result, status_code = ECCService.ecdh_shared_secrets_batch(private_key_a, public_keys_b, curve)
+        return jsonify(result), status_code
+    
+    except Exception as e:
+        return jsonify(create_error_response(f"Batch ECDH shared secret calculation failed: {str(e)}")[0]), 500
+
 @ecc_bp.route('/sign', methods=['POST'])
 def sign():
     """Sign a message using ECC private key (ECDSA)"""
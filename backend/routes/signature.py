@@ -76,6 +76,30 @@ def verify():
     except Exception as e:
         return jsonify(create_error_response(f"Verification request failed: {str(e)}")[0]), 500
 
+@signature_bp.route('/verify-batch', methods=['POST'])
+def verify_batch():
+    """Verify a batch of digital signatures"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify(create_error_response("No JSON data provided")[0]), 400
+        
+        # Validate required fields
+        required_fields = ['items']
+        is_valid, error_msg = validate_required_fields(data, required_fields)
+        if not is_valid:
+            return jsonify(create_error_response(error_msg)[0]), 400
+        
+        items = data['items']
+        algorithm = data.get('algorithm', 'RSA').upper()
+        
+        result, status_code = SignatureService.verify_batch(items, algorithm)
+        return jsonify(result), status_code
+    
+    except Exception as e:
+        return jsonify(create_error_response(f"Batch verification request failed: {str(e)}")[0]), 500
+
 @signature_bp.route('/sign-and-verify', methods=['POST'])
 def sign_and_verify():
     """Complete workflow: generate keys, sign message, and verify signature"""
@@ -101,12 +125,24 @@ def sign_and_verify():
         elif algorithm == 'ECC':
             kwargs['curve'] = data.get('curve', 'secp256r1')
         
-        result, status_code = SignatureService.sign_and_verify(message, algorithm, **kwargs)
+        use_cached_key = data.get('use_cached_key', True)
+        
+        result, status_code = SignatureService.sign_and_verify(message, algorithm, use_cached_key, **kwargs)
         return jsonify(result), status_code
     
     except Exception as e:
         return jsonify(create_error_response(f"Sign and verify workflow failed: {str(e)}")[0]), 500
 
+@signature_bp.route('/rotate-demo-keys', methods=['POST'])
+def rotate_demo_keys():
+    """Discard the keypairs cached by the sign-and-verify workflow"""
+    try:
+        result, status_code = SignatureService.rotate_demo_keys()
+        return jsonify(result), status_code
+    
+    except Exception as e:
+        return jsonify(create_error_response(f"Key rotation failed: {str(e)}")[0]), 500
+
 @signature_bp.route('/hash-sign', methods=['POST'])
 def hash_sign():
     """Create hash-based signature (HMAC-like)"""
@@ -220,9 +256,11 @@ def info():
             "/generate-keypair": "Generate key pair for RSA/ECC digital signatures",
             "/sign": "Sign message using RSA/ECC private key",
             "/verify": "Verify RSA/ECC digital signature",
+            "/verify-batch": "Verify many RSA/ECC digital signatures in one request",
             "/hash-sign": "Create hash-based signature (HMAC)",
             "/hash-verify": "Verify hash-based signature",
             "/sign-and-verify": "Complete workflow: generate keys, sign, and verify",
+            "/rotate-demo-keys": "Discard the keypairs cached by /sign-and-verify",
             "/info": "Get module information"
         },
         "generate_keypair_parameters": {
@@ -241,6 +279,10 @@ def info():
             "public_key": "PEM formatted public key (required)",
             "algorithm": "Algorithm type - RSA or ECC (optional, default: RSA)"
         },
+        "verify_batch_parameters": {
+            "items": "List of {message, signature, public_key} objects (required)",
+            "algorithm": "Algorithm type - RSA or ECC (optional, default: RSA)"
+        },
         "hash_sign_parameters": {
             "message": "Message to sign (required)",
             "key": "Secret key for HMAC (required)",
@@ -256,6 +298,7 @@ def info():
             "message": "Message to sign and verify (required)",
             "algorithm": "Algorithm type - RSA or ECC (optional, default: RSA)",
             "key_size": "RSA key size in bits (optional, default: 2048)",
-            "curve": "ECC curve name (optional, default: secp256r1)"
+            "curve": "ECC curve name (optional, default: secp256r1)",
+            "use_cached_key": "Reuse the keypair from an earlier call with the same parameters (optional, default: true)"
         }
     })
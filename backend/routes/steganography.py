@@ -29,8 +29,11 @@ def embed_message():
         if not message:
             return jsonify(create_error_response("Message is required")[0]), 400
         
+        # Carrier channels: 'RGB' (default) or 'B' for the blue plane only
+        channels = request.form.get('channels', 'RGB').upper()
+        
         # Process the image
-        result, status_code = SteganographyService.embed_message(image_file, message)
+        result, status_code = SteganographyService.embed_message(image_file, message, channels=channels)
         
         if status_code == 200:
             # Convert bytes to base64 for JSON response
@@ -63,8 +66,11 @@ def embed_message_download():
         if not message:
             return jsonify(create_error_response("Message is required")[0]), 400
         
+        # Carrier channels: 'RGB' (default) or 'B' for the blue plane only
+        channels = request.form.get('channels', 'RGB').upper()
+        
         # Process the image
-        result, status_code = SteganographyService.embed_message(image_file, message)
+        result, status_code = SteganographyService.embed_message(image_file, message, channels=channels)
         
         if status_code != 200:
             return jsonify(result), status_code
@@ -99,8 +105,11 @@ def extract_message():
         if not allowed_file(image_file.filename):
             return jsonify(create_error_response("Invalid image file type")[0]), 400
         
+        # Carrier channels: 'RGB' (default) or 'B' for the blue plane only
+        channels = request.form.get('channels', 'RGB').upper()
+        
         # Process the image
-        result, status_code = SteganographyService.extract_message(image_file)
+        result, status_code = SteganographyService.extract_message(image_file, channels=channels)
         return jsonify(result), status_code
     
     except Exception as e:
@@ -122,8 +131,11 @@ def get_capacity():
         if not allowed_file(image_file.filename):
             return jsonify(create_error_response("Invalid image file type")[0]), 400
         
+        # Carrier channels: 'RGB' (default) or 'B' for the blue plane only
+        channels = request.form.get('channels', 'RGB').upper()
+        
         # Process the image
-        result, status_code = SteganographyService.get_image_capacity(image_file)
+        result, status_code = SteganographyService.get_image_capacity(image_file, channels=channels)
         return jsonify(result), status_code
     
     except Exception as e:
@@ -171,13 +183,16 @@ def info():
         },
         "embed_parameters": {
             "image": "Image file (multipart/form-data, required)",
-            "message": "Secret message to embed (form field, required)"
+            "message": "Secret message to embed (form field, required)",
+            "channels": "Carrier channels - RGB or B for the blue plane only (form field, optional, default: RGB)"
         },
         "extract_parameters": {
-            "image": "Image file containing hidden message (multipart/form-data, required)"
+            "image": "Image file containing hidden message (multipart/form-data, required)",
+            "channels": "Carrier channels - RGB or B for the blue plane only (form field, optional, default: RGB)"
         },
         "capacity_parameters": {
-            "image": "Image file (multipart/form-data, required)"
+            "image": "Image file (multipart/form-data, required)",
+            "channels": "Carrier channels - RGB or B for the blue plane only (form field, optional, default: RGB)"
         },
         "compare_parameters": {
             "original": "Original image file (multipart/form-data, required)",
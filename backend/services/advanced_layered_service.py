@@ -12,6 +12,7 @@ import json
 import hashlib
 import secrets
 import base64
+import traceback
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 from .aes_service import AESService
@@ -373,7 +374,6 @@ class AdvancedLayeredService:
             }
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {
                 'success': False,
@@ -647,7 +647,6 @@ class AdvancedLayeredService:
             }
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {
                 'success': False,
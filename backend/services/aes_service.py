@@ -1,9 +1,50 @@
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
+import binascii
 import hashlib
 from .utils import encode_base64, decode_base64, create_error_response, create_success_response, CryptoException
 
+VALID_KEY_SIZES = frozenset({128, 192, 256})
+IV_SIZE = 16  # AES block size in bytes
+GCM_TAG_SIZE = 16
+
+# Cipher factories per mode, each called as factory(prepared_key, iv_bytes)
+_MODE_FACTORIES = {
+    'ECB': lambda key, iv: AES.new(key, AES.MODE_ECB),
+    'CBC': lambda key, iv: AES.new(key, AES.MODE_CBC, iv),
+    # The whole 16-byte IV is used as the initial counter block
+    'CTR': lambda key, iv: AES.new(key, AES.MODE_CTR, nonce=b'', initial_value=iv),
+    'GCM': lambda key, iv: AES.new(key, AES.MODE_GCM, nonce=iv),
+}
+
+def _gcm_encrypt(cipher, data: bytes) -> bytes:
+    ciphertext, tag = cipher.encrypt_and_digest(data)
+    return ciphertext + tag
+
+# Per-mode encrypt/decrypt operations on a ready cipher object. Block modes
+# pad to 16 bytes; CTR and GCM are stream modes and need no padding.
+_ENCRYPT_OPERATIONS = {
+    'ECB': lambda cipher, data: cipher.encrypt(pad(data, AES.block_size)),
+    'CBC': lambda cipher, data: cipher.encrypt(pad(data, AES.block_size)),
+    'CTR': lambda cipher, data: cipher.encrypt(data),
+    'GCM': _gcm_encrypt,
+}
+
+_DECRYPT_OPERATIONS = {
+    'ECB': lambda cipher, data: unpad(cipher.decrypt(data), AES.block_size),
+    'CBC': lambda cipher, data: unpad(cipher.decrypt(data), AES.block_size),
+    'CTR': lambda cipher, data: cipher.decrypt(data),
+    'GCM': lambda cipher, data: cipher.decrypt_and_verify(data[:-GCM_TAG_SIZE], data[-GCM_TAG_SIZE:]),
+}
+
+# Every valid (mode, key_size) configuration, built once per process
+CIPHER_FACTORIES = {
+    (mode, key_size): factory
+    for mode, factory in _MODE_FACTORIES.items()
+    for key_size in VALID_KEY_SIZES
+}
+
 class AESService:
     """Service for AES encryption and decryption operations"""
     
@@ -17,19 +58,76 @@ class AESService:
     @staticmethod
     def _prepare_iv() -> bytes:
         """Generate random IV for CBC mode"""
-        return get_random_bytes(16)  # AES block size is 16 bytes
+        return get_random_bytes(IV_SIZE)
     
     @staticmethod
-    def encrypt(plaintext: str, key: str, mode: str = 'CBC', key_size: int = 256, iv: str = None):
+    def _parse_iv(iv: str) -> bytes:
+        """Parse a user supplied IV (plain text or base64) into 16 bytes"""
+        # First check if it's exactly 16 characters - treat as plain text
+        if len(iv) == IV_SIZE:
+            return iv.encode('utf-8')
+        
+        # Try to decode as base64
+        try:
+            iv_bytes = decode_base64(iv)
+        except ValueError:
+            # If base64 decode fails, treat as plain text and pad/truncate to 16 bytes
+            iv_text = iv.encode('utf-8')
+            if len(iv_text) < IV_SIZE:
+                return iv_text + b'\x00' * (IV_SIZE - len(iv_text))  # Pad with zeros
+            return iv_text[:IV_SIZE]  # Truncate to 16 bytes
+        
+        if len(iv_bytes) != IV_SIZE:
+            raise CryptoException("Incorrect IV length (it must be 16 bytes long)")
+        return iv_bytes
+    
+    @staticmethod
+    def _encode_iv_and_ciphertext(iv_bytes: bytes, ciphertext: bytes):
+        """
+        Base64 encode a 16-byte IV and the ciphertext with a single encoder call
+        
+        The IV is followed by two zero bytes so the combined prefix is 18 bytes
+        (a multiple of 3): the ciphertext starts on a base64 group boundary and
+        the IV's own encoding is recovered by restoring its '==' padding.
+        """
+        encoded = binascii.b2a_base64(iv_bytes + b'\x00\x00' + ciphertext, newline=False).decode('ascii')
+        return encoded[24:], encoded[:22] + '=='
+    
+    @staticmethod
+    def _get_cipher_factory(mode: str, key_size: int):
+        """
+        Look up the cipher factory for a (mode, key_size) configuration
+        
+        Returns:
+            Tuple of (factory, error_response); exactly one of them is None
+        """
+        try:
+            factory = CIPHER_FACTORIES.get((mode, key_size))
+        except TypeError:  # unhashable key_size from JSON
+            factory = None
+        
+        if factory is not None:
+            return factory, None
+        
+        if mode in _MODE_FACTORIES:
+            return None, create_error_response("Key size must be 128, 192, or 256 bits")
+        return None, create_error_response("Mode must be ECB, CBC, CTR or GCM")
+    
+    @staticmethod
+    def encrypt(plaintext, key: str, mode: str = 'CBC', key_size: int = 256, iv: str = None):
         """
         Encrypt plaintext using AES
         
+        CTR and GCM are stream modes: no padding is applied and blocks are
+        processed independently. CTR provides no integrity protection on its
+        own; GCM appends a 16-byte authentication tag to the ciphertext.
+        
         Args:
-            plaintext: Text to encrypt
+            plaintext: Text to encrypt (str, or bytes to skip UTF-8 encoding)
             key: Encryption key
-            mode: AES mode (ECB or CBC)
+            mode: AES mode (ECB, CBC, CTR or GCM)
             key_size: Key size in bits (128, 192, 256)
-            iv: IV for CBC mode (optional, will generate if not provided)
+            iv: IV/nonce for CBC, CTR and GCM modes (optional, will generate if not provided)
         
         Returns:
             Tuple of (result_dict, status_code)
@@ -39,63 +137,45 @@ class AESService:
             if not plaintext or not key:
                 return create_error_response("Plaintext and key are required")
             
-            if key_size not in [128, 192, 256]:
-                return create_error_response("Key size must be 128, 192, or 256 bits")
-            
-            if mode.upper() not in ['ECB', 'CBC']:
-                return create_error_response("Mode must be ECB or CBC")
+            mode = mode.upper()
+            factory, error = AESService._get_cipher_factory(mode, key_size)
+            if error:
+                return error
             
             # Prepare key
             prepared_key = AESService._prepare_key(key, key_size)
             
             # Prepare plaintext
-            plaintext_bytes = plaintext.encode('utf-8')
+            plaintext_bytes = plaintext if isinstance(plaintext, (bytes, bytearray)) else plaintext.encode('utf-8')
+            
+            # ECB takes no IV; every other mode uses the supplied or a fresh one
+            if mode == 'ECB':
+                iv_bytes = None
+            else:
+                iv_bytes = AESService._parse_iv(iv) if iv else AESService._prepare_iv()
             
-            # Create cipher based on mode
-            if mode.upper() == 'ECB':
-                cipher = AES.new(prepared_key, AES.MODE_ECB)
-                padded_data = pad(plaintext_bytes, AES.block_size)
-                ciphertext = cipher.encrypt(padded_data)
-                
+            cipher = factory(prepared_key, iv_bytes)
+            ciphertext = _ENCRYPT_OPERATIONS[mode](cipher, plaintext_bytes)
+            
+            if iv_bytes is None:
                 return create_success_response({
                     "ciphertext": encode_base64(ciphertext),
-                    "mode": mode.upper(),
+                    "mode": mode,
                     "key_size": key_size,
                     "iv": None
                 })
             
-            else:  # CBC mode
-                if iv:
-                    # First check if it's exactly 16 characters - treat as plain text
-                    if len(iv) == 16:
-                        iv_bytes = iv.encode('utf-8')
-                    else:
-                        # Try to decode as base64
-                        try:
-                            iv_bytes = decode_base64(iv)
-                            if len(iv_bytes) != 16:
-                                return create_error_response("Incorrect IV length (it must be 16 bytes long)")
-                        except:
-                            # If base64 decode fails, treat as plain text and pad/truncate to 16 bytes
-                            iv_text = iv.encode('utf-8')
-                            if len(iv_text) < 16:
-                                iv_bytes = iv_text + b'\x00' * (16 - len(iv_text))  # Pad with zeros
-                            else:
-                                iv_bytes = iv_text[:16]  # Truncate to 16 bytes
-                else:
-                    iv_bytes = AESService._prepare_iv()
-                
-                cipher = AES.new(prepared_key, AES.MODE_CBC, iv_bytes)
-                padded_data = pad(plaintext_bytes, AES.block_size)
-                ciphertext = cipher.encrypt(padded_data)
-                
-                return create_success_response({
-                    "ciphertext": encode_base64(ciphertext),
-                    "mode": mode.upper(),
-                    "key_size": key_size,
-                    "iv": encode_base64(iv_bytes)
-                })
+            ciphertext_b64, iv_b64 = AESService._encode_iv_and_ciphertext(iv_bytes, ciphertext)
+            
+            return create_success_response({
+                "ciphertext": ciphertext_b64,
+                "mode": mode,
+                "key_size": key_size,
+                "iv": iv_b64
+            })
         
+        except CryptoException as e:
+            return create_error_response(str(e))
         except Exception as e:
             return create_error_response(f"Encryption failed: {str(e)}")
     
@@ -105,11 +185,11 @@ class AESService:
         Decrypt ciphertext using AES
         
         Args:
-            ciphertext: Base64 encoded ciphertext
+            ciphertext: Base64 encoded ciphertext (GCM: ciphertext followed by the 16-byte tag)
             key: Decryption key
-            mode: AES mode (ECB or CBC)
+            mode: AES mode (ECB, CBC, CTR or GCM)
             key_size: Key size in bits (128, 192, 256)
-            iv: Base64 encoded IV (required for CBC mode)
+            iv: Base64 encoded IV/nonce (required for CBC, CTR and GCM modes)
         
         Returns:
             Tuple of (result_dict, status_code)
@@ -119,54 +199,31 @@ class AESService:
             if not ciphertext or not key:
                 return create_error_response("Ciphertext and key are required")
             
-            if key_size not in [128, 192, 256]:
-                return create_error_response("Key size must be 128, 192, or 256 bits")
-            
-            if mode.upper() not in ['ECB', 'CBC']:
-                return create_error_response("Mode must be ECB or CBC")
+            mode = mode.upper()
+            factory, error = AESService._get_cipher_factory(mode, key_size)
+            if error:
+                return error
             
-            if mode.upper() == 'CBC' and (not iv or not iv.strip()):
-                return create_error_response("IV is required for CBC mode")
+            if mode != 'ECB' and (not iv or not iv.strip()):
+                return create_error_response(f"IV is required for {mode} mode")
             
             # Prepare key and ciphertext
             prepared_key = AESService._prepare_key(key, key_size)
             ciphertext_bytes = decode_base64(ciphertext)
             
-            # Create cipher based on mode
-            if mode.upper() == 'ECB':
-                cipher = AES.new(prepared_key, AES.MODE_ECB)
-                decrypted_padded = cipher.decrypt(ciphertext_bytes)
-                decrypted_data = unpad(decrypted_padded, AES.block_size)
-                
-            else:  # CBC mode
-                # First check if it's exactly 16 characters - treat as plain text
-                if len(iv) == 16:
-                    iv_bytes = iv.encode('utf-8')
-                else:
-                    # Try to decode as base64
-                    try:
-                        iv_bytes = decode_base64(iv)
-                        if len(iv_bytes) != 16:
-                            return create_error_response("Incorrect IV length (it must be 16 bytes long)")
-                    except:
-                        # If base64 decode fails, treat as plain text and pad/truncate to 16 bytes
-                        iv_text = iv.encode('utf-8')
-                        if len(iv_text) < 16:
-                            iv_bytes = iv_text + b'\x00' * (16 - len(iv_text))  # Pad with zeros
-                        else:
-                            iv_bytes = iv_text[:16]  # Truncate to 16 bytes
-                
-                cipher = AES.new(prepared_key, AES.MODE_CBC, iv_bytes)
-                decrypted_padded = cipher.decrypt(ciphertext_bytes)
-                decrypted_data = unpad(decrypted_padded, AES.block_size)
+            iv_bytes = None if mode == 'ECB' else AESService._parse_iv(iv)
+            cipher = factory(prepared_key, iv_bytes)
+            decrypted_data = _DECRYPT_OPERATIONS[mode](cipher, ciphertext_bytes)
             
             plaintext = decrypted_data.decode('utf-8')
             
             return create_success_response({
                 "plaintext": plaintext,
-                "mode": mode.upper(),
+                "mode": mode,
                 "key_size": key_size
             })
         
+        except CryptoException as e:
+            return create_error_response(str(e))
         except Exception as e:
             return create_error_response(f"Decryption failed: {str(e)}")
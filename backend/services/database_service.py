@@ -8,9 +8,30 @@ import hashlib
 import secrets
 import os
 from datetime import datetime
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List, Union
 
 
+INSERT_USER_SQL = '''
+    INSERT INTO users (username, email, password_hash, salt, full_name)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+SELECT_USER_BY_EMAIL_SQL = '''
+    SELECT id, username, email, salt, full_name
+    FROM users WHERE email = ? COLLATE NOCASE
+'''
+
+SELECT_USER_BY_USERNAME_SQL = '''
+    SELECT id, username, email, salt, full_name
+    FROM users WHERE username = ? COLLATE NOCASE
+'''
+
+# Verifies the password hash and records the login in one statement
+UPDATE_LOGIN_IF_PASSWORD_MATCHES_SQL = '''
+    UPDATE users SET last_login = CURRENT_TIMESTAMP
+    WHERE id = ? AND password_hash = ?
+'''
+
 class DatabaseService:
     """Service for managing user database and authentication"""
     
@@ -30,22 +51,23 @@ class DatabaseService:
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    salt TEXT NOT NULL,
+                    username TEXT UNIQUE NOT NULL COLLATE NOCASE,
+                    email TEXT UNIQUE NOT NULL COLLATE NOCASE,
+                    password_hash BLOB NOT NULL,
+                    salt BLOB NOT NULL,
                     full_name TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     last_login TIMESTAMP
                 )
             ''')
             
-            # Create index on username and email for faster lookups
+            # Case-insensitive indexes so lookups don't need to lowercase in Python
+            # (also covers databases created before the columns were NOCASE)
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_username ON users(username)
+                CREATE INDEX IF NOT EXISTS idx_username_nocase ON users(username COLLATE NOCASE)
             ''')
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_email ON users(email)
+                CREATE INDEX IF NOT EXISTS idx_email_nocase ON users(email COLLATE NOCASE)
             ''')
             
             conn.commit()
@@ -59,24 +81,30 @@ class DatabaseService:
             return False
     
     @staticmethod
-    def hash_password(password: str, salt: str = None) -> Tuple[str, str]:
+    def hash_password(password: str, salt: Union[bytes, str] = None) -> Tuple[Union[bytes, str], Union[bytes, str]]:
         """
         Hash password using SHA-256 with salt
         
         Args:
             password: Plain text password
-            salt: Optional salt (generates new if not provided)
+            salt: Optional salt (generates new if not provided). Raw bytes for
+                  current accounts; hex strings from older rows are still accepted
             
         Returns:
-            Tuple of (password_hash, salt)
+            Tuple of (password_hash, salt) - raw digest bytes for byte salts,
+            hex digest for legacy hex salts
         """
         if salt is None:
             # Generate random 32-byte salt
-            salt = secrets.token_hex(32)
+            salt = secrets.token_bytes(32)
+        
+        if isinstance(salt, str):
+            # Legacy accounts: hex salt appended to the password as text
+            password_with_salt = (password + salt).encode('utf-8')
+            return hashlib.sha256(password_with_salt).hexdigest(), salt
         
         # Combine password and salt, then hash with SHA-256
-        password_with_salt = (password + salt).encode('utf-8')
-        password_hash = hashlib.sha256(password_with_salt).hexdigest()
+        password_hash = hashlib.sha256(password.encode('utf-8') + salt).digest()
         
         return password_hash, salt
     
@@ -115,10 +143,7 @@ class DatabaseService:
             conn = sqlite3.connect(DatabaseService.DB_PATH)
             cursor = conn.cursor()
             
-            cursor.execute('''
-                INSERT INTO users (username, email, password_hash, salt, full_name)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (username.lower(), email.lower(), password_hash, salt, full_name))
+            cursor.execute(INSERT_USER_SQL, (username.lower(), email.lower(), password_hash, salt, full_name))
             
             user_id = cursor.lastrowid
             conn.commit()
@@ -151,6 +176,61 @@ class DatabaseService:
             print(f"[DATABASE] Error creating user: {str(e)}")
             return {"success": False, "error": f"Registration failed: {str(e)}"}, 500
     
+    @staticmethod
+    def create_users_bulk(users: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], int]:
+        """
+        Create many user accounts in a single transaction (seeding / admin import)
+        
+        Args:
+            users: List of dicts with username, email, password and optional full_name
+            
+        Returns:
+            Tuple of (result_dict, status_code)
+        """
+        try:
+            rows = []
+            for index, user in enumerate(users):
+                username = user.get('username')
+                email = user.get('email')
+                password = user.get('password')
+                
+                if not username or len(username) < 3:
+                    return {"success": False, "error": f"User {index}: Username must be at least 3 characters"}, 400
+                
+                if not email or '@' not in email:
+                    return {"success": False, "error": f"User {index}: Invalid email address"}, 400
+                
+                if not password or len(password) < 6:
+                    return {"success": False, "error": f"User {index}: Password must be at least 6 characters"}, 400
+                
+                password_hash, salt = DatabaseService.hash_password(password)
+                rows.append((username.lower(), email.lower(), password_hash, salt, user.get('full_name')))
+            
+            conn = sqlite3.connect(DatabaseService.DB_PATH)
+            try:
+                # One commit (and one fsync) for the whole batch
+                conn.execute('PRAGMA synchronous = NORMAL')
+                with conn:
+                    conn.executemany(INSERT_USER_SQL, rows)
+            finally:
+                conn.close()
+            
+            print(f"[DATABASE] Bulk created {len(rows)} users")
+            
+            return {
+                "success": True,
+                "message": f"{len(rows)} users created successfully",
+                "count": len(rows)
+            }, 201
+            
+        except sqlite3.IntegrityError as e:
+            print(f"[DATABASE] Integrity error during bulk insert: {str(e)}")
+            return {"success": False, "error": f"Bulk insert rolled back: {str(e)}"}, 409
+                
+        except Exception as e:
+            print(f"[DATABASE] Error bulk creating users: {str(e)}")
+            return {"success": False, "error": f"Bulk registration failed: {str(e)}"}, 500
+    
     @staticmethod
     def authenticate_user(username: str, password: str) -> Tuple[Dict[str, Any], int]:
         """
@@ -169,19 +249,11 @@ class DatabaseService:
             conn = sqlite3.connect(DatabaseService.DB_PATH)
             cursor = conn.cursor()
             
-            # Check if input is email or username
-            if '@' in username:
-                print(f"[DATABASE] Logging in with email")
-                cursor.execute('''
-                    SELECT id, username, email, password_hash, salt, full_name
-                    FROM users WHERE email = ?
-                ''', (username.lower(),))
-            else:
-                print(f"[DATABASE] Logging in with username")
-                cursor.execute('''
-                    SELECT id, username, email, password_hash, salt, full_name
-                    FROM users WHERE username = ?
-                ''', (username.lower(),))
+            # Check if input is email or username (single scan, no case folding:
+            # the NOCASE collation handles case in SQLite)
+            is_email = '@' in username
+            print(f"[DATABASE] Logging in with {'email' if is_email else 'username'}")
+            cursor.execute(SELECT_USER_BY_EMAIL_SQL if is_email else SELECT_USER_BY_USERNAME_SQL, (username,))
             
             user = cursor.fetchone()
             
@@ -190,27 +262,26 @@ class DatabaseService:
                 print(f"[DATABASE] User not found")
                 return {"success": False, "error": "Invalid username or password"}, 401
             
-            user_id, db_username, email, stored_hash, salt, full_name = user
+            user_id, db_username, email, salt, full_name = user
             print(f"[DATABASE] User found: {db_username}")
             
             # Hash provided password with stored salt
             password_hash, _ = DatabaseService.hash_password(password, salt)
             
-            # Compare hashes
-            if password_hash != stored_hash:
+            # Let SQLite compare the hashes and update last login time together;
+            # the stored hash never needs to be read back into Python
+            cursor.execute(UPDATE_LOGIN_IF_PASSWORD_MATCHES_SQL, (user_id, password_hash))
+            
+            if cursor.rowcount != 1:
                 conn.close()
                 print(f"[DATABASE] Password mismatch")
                 return {"success": False, "error": "Invalid username or password"}, 401
             
-            print(f"[DATABASE] Password verified successfully")
-            
-            # Update last login time
-            cursor.execute('''
-                UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
-            ''', (user_id,))
             conn.commit()
             conn.close()
             
+            print(f"[DATABASE] Password verified successfully")
+            
             print(f"[DATABASE] Login successful for user: {db_username}")
             
             return {
@@ -290,7 +361,3 @@ class DatabaseService:
         except Exception as e:
             print(f"Error getting users: {str(e)}")
             return []
-
-
-# Initialize database when module is imported
-DatabaseService.init_database()
@@ -1,20 +1,185 @@
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives import serialization, hashes
-from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import UnsupportedAlgorithm
 from tinyec import registry
+from tinyec.ec import Point, Inf
 import secrets
 import hashlib
 import base64
-from .utils import encode_base64, decode_base64, create_error_response, create_success_response, CryptoException
+from .utils import (
+    encode_base64, decode_base64, create_error_response, create_success_response, CryptoException,
+    load_private_key_pem, load_public_key_pem, verify_signature_batch
+)
+
+def _build_openssl_ecdh_curves() -> dict:
+    """Map ECDH demo curve names to OpenSSL curves supported by this build"""
+    candidates = {
+        'brainpoolP256r1': ec.BrainpoolP256R1(),
+        'brainpoolP384r1': ec.BrainpoolP384R1(),
+        'brainpoolP512r1': ec.BrainpoolP512R1(),
+        'secp192r1': ec.SECP192R1(),
+        'secp224r1': ec.SECP224R1(),
+        'secp256r1': ec.SECP256R1(),
+        'secp384r1': ec.SECP384R1(),
+        'secp521r1': ec.SECP521R1()
+    }
+    supported = {}
+    for name, curve in candidates.items():
+        try:
+            ec.generate_private_key(curve)
+        except UnsupportedAlgorithm:
+            continue
+        supported[name] = curve
+    return supported
+
+# Curves whose ECDH scalar multiplication runs in OpenSSL; anything missing
+# here falls back to the pure-Python ladder below
+_OPENSSL_ECDH_CURVES = _build_openssl_ecdh_curves()
+
+# Jacobian coordinates (X, Y, Z) represent the affine point (X/Z^2, Y/Z^3);
+# Z == 0 is the point at infinity. No field inversion is needed until the end.
+_JACOBIAN_INFINITY = (1, 1, 0)
+
+def _jacobian_double(P, a: int, p: int):
+    X, Y, Z = P
+    if Z == 0 or Y == 0:
+        return _JACOBIAN_INFINITY
+    YY = Y * Y % p
+    S = 4 * X * YY % p
+    ZZ = Z * Z % p
+    M = (3 * X * X + a * ZZ * ZZ) % p
+    X3 = (M * M - 2 * S) % p
+    Y3 = (M * (S - X3) - 8 * YY * YY) % p
+    return X3, Y3, 2 * Y * Z % p
+
+def _jacobian_add(P, Q, a: int, p: int):
+    X1, Y1, Z1 = P
+    X2, Y2, Z2 = Q
+    if Z1 == 0:
+        return Q
+    if Z2 == 0:
+        return P
+    Z1Z1 = Z1 * Z1 % p
+    Z2Z2 = Z2 * Z2 % p
+    U1 = X1 * Z2Z2 % p
+    U2 = X2 * Z1Z1 % p
+    S1 = Y1 * Z2 * Z2Z2 % p
+    S2 = Y2 * Z1 * Z1Z1 % p
+    if U1 == U2:
+        return _jacobian_double(P, a, p) if S1 == S2 else _JACOBIAN_INFINITY
+    H = U2 - U1
+    R = S2 - S1
+    HH = H * H % p
+    HHH = H * HH % p
+    V = U1 * HH % p
+    X3 = (R * R - HHH - 2 * V) % p
+    Y3 = (R * (V - X3) - S1 * HHH) % p
+    return X3, Y3, Z1 * Z2 * H % p
+
+def _ladder_jacobian(k: int, point, a: int, p: int):
+    """Montgomery ladder computing k * point, result left in Jacobian coordinates"""
+    R0, R1 = _JACOBIAN_INFINITY, (point.x, point.y, 1)
+    for bit in bin(k)[2:]:
+        if bit == '1':
+            R0, R1 = _jacobian_add(R0, R1, a, p), _jacobian_double(R1, a, p)
+        else:
+            R0, R1 = _jacobian_double(R0, a, p), _jacobian_add(R0, R1, a, p)
+    return R0
+
+def _ladder_scalar_mult(scalar: int, point):
+    """
+    Pure-Python scalar * point for curves OpenSSL cannot handle
+    
+    Montgomery ladder over Jacobian coordinates with a single inversion at
+    the end, instead of tinyec's affine double-and-add (one modular inverse
+    per step). Returns a tinyec Point, or Inf for the point at infinity.
+    """
+    curve = point.curve
+    a, p = curve.a, curve.field.p
+    
+    X, Y, Z = _ladder_jacobian(scalar % curve.field.n, point, a, p)
+    if Z == 0:
+        return Inf(curve)
+    z_inv = pow(Z, -1, p)
+    z_inv2 = z_inv * z_inv % p
+    return Point(curve, X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+
+def _ladder_scalar_mult_batch(scalar: int, points: list) -> list:
+    """
+    _ladder_scalar_mult for many points on one curve with one shared inversion
+    
+    Uses Montgomery's simultaneous inversion: invert the product of all Z
+    values once, then peel off each 1/Z with two multiplications.
+    """
+    if not points:
+        return []
+    curve = points[0].curve
+    a, p = curve.a, curve.field.p
+    k = scalar % curve.field.n
+    
+    jacobians = [_ladder_jacobian(k, point, a, p) for point in points]
+    
+    # prefixes[i] is the product of the non-zero Z values before index i
+    prefixes = []
+    acc = 1
+    for _, _, Z in jacobians:
+        prefixes.append(acc)
+        if Z:
+            acc = acc * Z % p
+    inv = pow(acc, -1, p)
+    
+    results = [None] * len(jacobians)
+    for i in range(len(jacobians) - 1, -1, -1):
+        X, Y, Z = jacobians[i]
+        if Z == 0:
+            results[i] = Inf(curve)
+            continue
+        z_inv = inv * prefixes[i] % p
+        inv = inv * Z % p
+        z_inv2 = z_inv * z_inv % p
+        results[i] = Point(curve, X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+    return results
+
+# ECC to RSA equivalent security mapping, with the derived strings precomputed
+_RSA_COMPARISON_TABLE = {
+    ecc_size: {
+        "rsa_equivalent": rsa_size,
+        "efficiency_ratio": f"{rsa_size / ecc_size:.1f}x",
+        "bandwidth_savings": f"{(rsa_size - ecc_size) / rsa_size * 100:.1f}%"
+    }
+    for ecc_size, rsa_size in ((160, 1024), (224, 2048), (256, 3072), (384, 7680), (512, 15360), (521, 15360))
+}
+
+_RSA_COMPARISON_UNKNOWN = {
+    "rsa_equivalent": "Unknown",
+    "efficiency_ratio": "Unknown",
+    "bandwidth_savings": "Unknown"
+}
+
+_ECC_ADVANTAGES = (
+    "Smaller key sizes",
+    "Faster operations",
+    "Lower bandwidth requirements",
+    "Better performance on mobile devices",
+    "Equivalent security with smaller keys"
+)
+
+# Constant fields shared by every ECDSA sign/verify and ECDH response
+_ECDSA_RESPONSE_BASE = {"hash_algorithm": "SHA256", "algorithm": "ECDSA"}
+_ECDH_RESPONSE_BASE = {"algorithm": "ECDH"}
 
 class ECCService:
     """Service for ECC key generation, signing, verification, and ECDH operations"""
     
     # Available curves for tinyec ECDH operations
-    TINYEC_CURVES = [
+    TINYEC_CURVES = frozenset({
         'brainpoolP256r1', 'brainpoolP384r1', 'brainpoolP512r1',
         'secp192r1', 'secp224r1', 'secp256r1', 'secp384r1', 'secp521r1'
-    ]
+    })
+    _TINYEC_CURVES_STR = ', '.join(sorted(TINYEC_CURVES))
+    
+    # tinyec curve objects, built once instead of on every request
+    _TINYEC_CURVE_CACHE = {name: registry.get_curve(name) for name in TINYEC_CURVES}
     
     @staticmethod
     def _get_curve(curve_name: str):
@@ -28,8 +193,44 @@ class ECCService:
     
     @staticmethod
     def _compress_point(public_key):
-        """Compress elliptic curve point for ECDH"""
-        return hex(public_key.x) + hex(public_key.y % 2)[2:]
+        """Compress elliptic curve point for ECDH (SEC1: 02/03 parity prefix + fixed-width X, hex)"""
+        prefix = b'\x03' if public_key.y & 1 else b'\x02'
+        byte_len = (public_key.curve.field.p.bit_length() + 7) >> 3
+        return (prefix + public_key.x.to_bytes(byte_len, 'big')).hex()
+    
+    @staticmethod
+    def _hash_shared_point(point) -> str:
+        """SHA-256 hex digest of an ECDH shared point (fixed-width big-endian X || Y)"""
+        byte_len = (point.curve.field.p.bit_length() + 7) >> 3
+        return hashlib.sha256(point.x.to_bytes(byte_len, 'big') + point.y.to_bytes(byte_len, 'big')).hexdigest()
+    
+    @staticmethod
+    def _openssl_scalar_mult(scalar: int, point, curve, openssl_curve, private_key=None):
+        """
+        Compute scalar * point with OpenSSL and return it as a tinyec Point
+        
+        ECDH in OpenSSL only yields the x coordinate of k*P. y is recovered from
+        the x coordinates of k*(P+G) and k*(P-G): with R = k*G and d = x - R.x,
+        x(Q-R) - x(Q+R) = 4*y*R.y / d^2, so no square root is needed.
+        The caller must ensure P is not +/-G (d would be zero).
+        private_key may be passed in when the same scalar is reused across calls.
+        """
+        p = curve.field.p
+        if private_key is None:
+            private_key = ec.derive_private_key(scalar % curve.field.n, openssl_curve)
+        
+        def exchange_x(peer) -> int:
+            peer_key = ec.EllipticCurvePublicNumbers(peer.x, peer.y, openssl_curve).public_key()
+            return int.from_bytes(private_key.exchange(ec.ECDH(), peer_key), 'big')
+        
+        x = exchange_x(point)
+        r = private_key.public_key().public_numbers()
+        x_plus = exchange_x(point + curve.g)
+        x_minus = exchange_x(point - curve.g)
+        
+        d = x - r.x
+        y = (x_minus - x_plus) * d * d * pow(4 * r.y, -1, p) % p
+        return Point(curve, x, y)
     
     @staticmethod
     def generate_keypair(curve: str = 'secp256r1'):
@@ -42,13 +243,30 @@ class ECCService:
         Returns:
             Tuple of (result_dict, status_code)
         """
+        result, status_code, _ = ECCService.generate_keypair_raw(curve)
+        return result, status_code
+    
+    @staticmethod
+    def generate_keypair_raw(curve: str = 'secp256r1'):
+        """
+        Generate ECC key pair and also return the live private key object
+        
+        Lets in-process callers sign or derive secrets without parsing
+        the PEM they were just given.
+        
+        Args:
+            curve: Elliptic curve name (secp256r1, secp384r1, secp521r1)
+        
+        Returns:
+            Tuple of (result_dict, status_code, private_key or None)
+        """
         try:
             curve_obj = ECCService._get_curve(curve)
             if not curve_obj:
-                return create_error_response("Invalid curve. Supported curves: secp256r1, secp384r1, secp521r1")
+                return (*create_error_response("Invalid curve. Supported curves: secp256r1, secp384r1, secp521r1"), None)
             
             # Generate private key
-            private_key = ec.generate_private_key(curve_obj, default_backend())
+            private_key = ec.generate_private_key(curve_obj)
             
             # Get public key
             public_key = private_key.public_key()
@@ -65,16 +283,16 @@ class ECCService:
                 format=serialization.PublicFormat.SubjectPublicKeyInfo
             ).decode('utf-8')
             
-            return create_success_response({
+            return (*create_success_response({
                 "private_key": private_pem,
                 "public_key": public_pem,
                 "curve": curve,
                 "key_size": private_key.curve.key_size,
                 "algorithm": "ECDSA"
-            })
+            }), private_key)
         
         except Exception as e:
-            return create_error_response(f"Key generation failed: {str(e)}")
+            return (*create_error_response(f"Key generation failed: {str(e)}"), None)
     
     @staticmethod
     def generate_ecdh_keypair(curve_name: str = 'brainpoolP256r1'):
@@ -89,16 +307,24 @@ class ECCService:
         """
         try:
             if curve_name not in ECCService.TINYEC_CURVES:
-                return create_error_response(f"Invalid curve. Supported curves: {', '.join(ECCService.TINYEC_CURVES)}")
+                return create_error_response(f"Invalid curve. Supported curves: {ECCService._TINYEC_CURVES_STR}")
             
             # Get the curve
-            curve = registry.get_curve(curve_name)
-            
-            # Generate private key (random integer)
-            private_key = secrets.randbelow(curve.field.n)
-            
-            # Generate public key (point on curve)
-            public_key = private_key * curve.g
+            curve = ECCService._TINYEC_CURVE_CACHE[curve_name]
+            
+            openssl_curve = _OPENSSL_ECDH_CURVES.get(curve_name)
+            if openssl_curve is not None:
+                # Let OpenSSL pick the private key and do the scalar multiplication
+                key = ec.generate_private_key(openssl_curve)
+                private_key = key.private_numbers().private_value
+                public_numbers = key.public_key().public_numbers()
+                public_key = Point(curve, public_numbers.x, public_numbers.y)
+            else:
+                # Generate private key (random integer)
+                private_key = secrets.randbelow(curve.field.n)
+                
+                # Generate public key (point on curve)
+                public_key = _ladder_scalar_mult(private_key, curve.g)
             
             # Compress public key
             compressed_public = ECCService._compress_point(public_key)
@@ -112,7 +338,7 @@ class ECCService:
                 "field_size": curve.field.n.bit_length(),
                 "generator_x": hex(curve.g.x),
                 "generator_y": hex(curve.g.y),
-                "algorithm": "ECDH"
+                **_ECDH_RESPONSE_BASE
             })
         
         except Exception as e:
@@ -134,10 +360,10 @@ class ECCService:
         """
         try:
             if curve_name not in ECCService.TINYEC_CURVES:
-                return create_error_response(f"Invalid curve. Supported curves: {', '.join(ECCService.TINYEC_CURVES)}")
+                return create_error_response(f"Invalid curve. Supported curves: {ECCService._TINYEC_CURVES_STR}")
             
             # Get the curve
-            curve = registry.get_curve(curve_name)
+            curve = ECCService._TINYEC_CURVE_CACHE[curve_name]
             
             # Convert hex strings to integers
             private_a = int(private_key_a, 16)
@@ -145,19 +371,21 @@ class ECCService:
             pub_b_y = int(public_key_b_y, 16)
             
             # Create public key point for party B
-            from tinyec.ec import Point
             public_key_b = Point(curve, pub_b_x, pub_b_y)
             
-            # Calculate shared secret
-            shared_secret_point = private_a * public_key_b
+            # Calculate shared secret (OpenSSL unless the curve is unsupported
+            # or B's key is +/-G, which the y recovery cannot handle)
+            openssl_curve = _OPENSSL_ECDH_CURVES.get(curve_name)
+            if openssl_curve is not None and pub_b_x != curve.g.x:
+                shared_secret_point = ECCService._openssl_scalar_mult(private_a, public_key_b, curve, openssl_curve)
+            else:
+                shared_secret_point = _ladder_scalar_mult(private_a, public_key_b)
             
             # Compress the shared secret
             shared_secret_compressed = ECCService._compress_point(shared_secret_point)
             
             # Generate a hash of the shared secret for practical use
-            shared_secret_hash = hashlib.sha256(
-                (str(shared_secret_point.x) + str(shared_secret_point.y)).encode()
-            ).hexdigest()
+            shared_secret_hash = ECCService._hash_shared_point(shared_secret_point)
             
             return create_success_response({
                 "shared_secret_x": hex(shared_secret_point.x),
@@ -165,19 +393,67 @@ class ECCService:
                 "compressed_shared_secret": shared_secret_compressed,
                 "shared_secret_hash": shared_secret_hash,
                 "curve": curve_name,
-                "algorithm": "ECDH"
+                **_ECDH_RESPONSE_BASE
             })
         
         except Exception as e:
             return create_error_response(f"ECDH shared secret calculation failed: {str(e)}")
     
     @staticmethod
-    def sign(message: str, private_key_pem: str):
+    def ecdh_shared_secrets_batch(private_key_a: str, public_keys_b: list, curve_name: str = 'brainpoolP256r1'):
+        """
+        Calculate ECDH shared secrets of one private key against many public keys
+        
+        Args:
+            private_key_a: Private key of party A (hex string)
+            public_keys_b: List of (x, y) hex string pairs, one per peer
+            curve_name: Name of the elliptic curve
+        
+        Returns:
+            Tuple of (result_dict, status_code)
+        """
+        try:
+            if curve_name not in ECCService.TINYEC_CURVES:
+                return create_error_response(f"Invalid curve. Supported curves: {ECCService._TINYEC_CURVES_STR}")
+            
+            if not public_keys_b:
+                return create_error_response("At least one public key is required")
+            
+            # Get the curve
+            curve = ECCService._TINYEC_CURVE_CACHE[curve_name]
+            
+            private_a = int(private_key_a, 16)
+            public_points = [Point(curve, int(x, 16), int(y, 16)) for x, y in public_keys_b]
+            
+            openssl_curve = _OPENSSL_ECDH_CURVES.get(curve_name)
+            if openssl_curve is not None:
+                # Derive A's OpenSSL key once and reuse it for every peer
+                private_key = ec.derive_private_key(private_a % curve.field.n, openssl_curve)
+                shared_points = [
+                    _ladder_scalar_mult(private_a, point) if point.x == curve.g.x
+                    else ECCService._openssl_scalar_mult(private_a, point, curve, openssl_curve, private_key)
+                    for point in public_points
+                ]
+            else:
+                shared_points = _ladder_scalar_mult_batch(private_a, public_points)
+            
+            return create_success_response({
+                "shared_secret_hashes": [ECCService._hash_shared_point(point) for point in shared_points],
+                "count": len(shared_points),
+                "curve": curve_name,
+                **_ECDH_RESPONSE_BASE
+            })
+        
+        except Exception as e:
+            return create_error_response(f"Batch ECDH shared secret calculation failed: {str(e)}")
+    
+    @staticmethod
+    def sign(message, private_key_pem: str):
         """
         Sign a message using ECC private key (ECDSA)
         
         Args:
-            message: Message to sign
+            message: Message to sign (str, or bytes to skip UTF-8 encoding)
             private_key_pem: PEM formatted private key
         
         Returns:
@@ -188,38 +464,46 @@ class ECCService:
                 return create_error_response("Message and private key are required")
             
             # Load private key
-            private_key = serialization.load_pem_private_key(
-                private_key_pem.encode('utf-8'),
-                password=None,
-                backend=default_backend()
-            )
+            private_key = load_private_key_pem(private_key_pem)
+            
+            return ECCService.sign_with_key(private_key, message)
+        
+        except Exception as e:
+            return create_error_response(f"Signing failed: {str(e)}")
+    
+    @staticmethod
+    def sign_with_key(private_key, message):
+        """Sign a message with an already loaded EllipticCurvePrivateKey (skips PEM parsing)"""
+        try:
+            if not message:
+                return create_error_response("Message is required")
             
             # Sign message
-            message_bytes = message.encode('utf-8')
+            message_bytes = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
             signature = private_key.sign(
                 message_bytes,
                 ec.ECDSA(hashes.SHA256())
             )
+            key_curve = private_key.curve
             
             return create_success_response({
                 "signature": encode_base64(signature),
                 "message": message,
-                "curve": private_key.curve.name,
-                "key_size": private_key.curve.key_size,
-                "hash_algorithm": "SHA256",
-                "algorithm": "ECDSA"
+                "curve": key_curve.name,
+                "key_size": key_curve.key_size,
+                **_ECDSA_RESPONSE_BASE
             })
         
         except Exception as e:
             return create_error_response(f"Signing failed: {str(e)}")
     
     @staticmethod
-    def verify(message: str, signature: str, public_key_pem: str):
+    def verify(message, signature: str, public_key_pem: str):
         """
         Verify ECC signature (ECDSA)
         
         Args:
-            message: Original message
+            message: Original message (str, or bytes to skip UTF-8 encoding)
             signature: Base64 encoded signature
             public_key_pem: PEM formatted public key
         
@@ -231,37 +515,49 @@ class ECCService:
                 return create_error_response("Message, signature, and public key are required")
             
             # Load public key
-            public_key = serialization.load_pem_public_key(
-                public_key_pem.encode('utf-8'),
-                backend=default_backend()
-            )
+            public_key = load_public_key_pem(public_key_pem)
             
             # Decode signature
             signature_bytes = decode_base64(signature)
             
             # Verify signature
-            try:
-                public_key.verify(
-                    signature_bytes,
-                    message.encode('utf-8'),
-                    ec.ECDSA(hashes.SHA256())
-                )
-                is_valid = True
-            except Exception:
-                is_valid = False
+            is_valid = ECCService._verify_with_key(public_key, message, signature_bytes)
+            key_curve = public_key.curve
             
             return create_success_response({
                 "valid": is_valid,
                 "message": message,
-                "curve": public_key.curve.name,
-                "key_size": public_key.curve.key_size,
-                "hash_algorithm": "SHA256",
-                "algorithm": "ECDSA"
+                "curve": key_curve.name,
+                "key_size": key_curve.key_size,
+                **_ECDSA_RESPONSE_BASE
             })
         
         except Exception as e:
             return create_error_response(f"Verification failed: {str(e)}")
     
+    @staticmethod
+    def _verify_with_key(public_key, message, signature: bytes) -> bool:
+        """Check one ECDSA signature against an already-loaded public key"""
+        try:
+            message_bytes = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+            public_key.verify(signature, message_bytes, ec.ECDSA(hashes.SHA256()))
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def verify_batch(items: list):
+        """
+        Verify many ECC signatures (ECDSA) in one call
+        
+        Args:
+            items: List of dicts with message, signature (base64) and public_key (PEM)
+        
+        Returns:
+            Tuple of (result_dict, status_code)
+        """
+        return verify_signature_batch(items, ECCService._verify_with_key, _ECDSA_RESPONSE_BASE)
+    
     @staticmethod
     def get_curve_info(curve_name: str = 'brainpoolP256r1'):
         """
@@ -275,10 +571,10 @@ class ECCService:
         """
         try:
             if curve_name not in ECCService.TINYEC_CURVES:
-                return create_error_response(f"Invalid curve. Supported curves: {', '.join(ECCService.TINYEC_CURVES)}")
+                return create_error_response(f"Invalid curve. Supported curves: {ECCService._TINYEC_CURVES_STR}")
             
             # Get the curve
-            curve = registry.get_curve(curve_name)
+            curve = ECCService._TINYEC_CURVE_CACHE[curve_name]
             
             return create_success_response({
                 "curve_name": curve_name,
@@ -321,37 +617,13 @@ class ECCService:
             Tuple of (result_dict, status_code)
         """
         try:
-            # ECC to RSA equivalent security mapping
-            ecc_to_rsa = {
-                160: 1024,
-                224: 2048,
-                256: 3072,
-                384: 7680,
-                512: 15360,
-                521: 15360
-            }
-            
-            rsa_equivalent = ecc_to_rsa.get(ecc_key_size, "Unknown")
-            
-            # Calculate efficiency ratio
-            if rsa_equivalent != "Unknown":
-                efficiency_ratio = rsa_equivalent / ecc_key_size
-            else:
-                efficiency_ratio = "Unknown"
+            comparison = _RSA_COMPARISON_TABLE.get(ecc_key_size, _RSA_COMPARISON_UNKNOWN)
             
             return create_success_response({
                 "ecc_key_size": ecc_key_size,
-                "rsa_equivalent": rsa_equivalent,
-                "efficiency_ratio": f"{efficiency_ratio:.1f}x" if efficiency_ratio != "Unknown" else "Unknown",
-                "bandwidth_savings": f"{((rsa_equivalent - ecc_key_size) / rsa_equivalent * 100):.1f}%" if rsa_equivalent != "Unknown" else "Unknown",
+                **comparison,
                 "security_level": ecc_key_size // 2,
-                "advantages": [
-                    "Smaller key sizes",
-                    "Faster operations",
-                    "Lower bandwidth requirements",
-                    "Better performance on mobile devices",
-                    "Equivalent security with smaller keys"
-                ]
+                "advantages": list(_ECC_ADVANTAGES)
             })
         
         except Exception as e:
@@ -374,29 +646,32 @@ class ECCService:
                 return create_error_response("Both private and public keys are required")
             
             # Load keys
-            private_key = serialization.load_pem_private_key(
-                private_key_pem.encode('utf-8'),
-                password=None,
-                backend=default_backend()
-            )
+            private_key = load_private_key_pem(private_key_pem)
             
-            public_key = serialization.load_pem_public_key(
-                public_key_pem.encode('utf-8'),
-                backend=default_backend()
-            )
+            public_key = load_public_key_pem(public_key_pem)
             
+            return ECCService._shared_secret_with_keys(private_key, public_key)
+        
+        except Exception as e:
+            return create_error_response(f"Shared secret generation failed: {str(e)}")
+    
+    @staticmethod
+    def _shared_secret_with_keys(private_key, public_key):
+        """Derive the hashed ECDH shared secret from already loaded key objects"""
+        try:
             # Generate shared secret
             shared_key = private_key.exchange(ec.ECDH(), public_key)
             
             # Hash the shared secret for use as symmetric key
-            digest = hashes.Hash(hashes.SHA256(), backend=default_backend())
+            digest = hashes.Hash(hashes.SHA256())
             digest.update(shared_key)
             shared_secret = digest.finalize()
+            key_curve = private_key.curve
             
             return create_success_response({
                 "shared_secret": encode_base64(shared_secret),
-                "curve": private_key.curve.name,
-                "key_size": private_key.curve.key_size
+                "curve": key_curve.name,
+                "key_size": key_curve.key_size
             })
         
         except Exception as e:
@@ -11,17 +11,33 @@ This order ensures steganography (LSB) is on top layer and can be extracted clea
 """
 
 import base64
-import io
+import logging
 from typing import Dict, Any, Tuple
 from PIL import Image
 from .steganography_service import SteganographyService
 from .watermarking_service import WatermarkingService
-from .utils import create_success_response, create_error_response
+from .utils import create_success_response, create_error_response, image_to_bytes, file_to_image
+
+logger = logging.getLogger(__name__)
 
 
 class LayeredImageService:
     """Service for layered image processing with steganography and watermarking"""
     
+    @staticmethod
+    def _decode_once(image_file, mode: str = None) -> Image.Image:
+        """
+        Decode the input image a single time so every layer reuses the same pixels
+        
+        Image.open is lazy; without this each layer would trigger its own decode
+        (and its own mode conversion when mode is given).
+        """
+        image = file_to_image(image_file) if hasattr(image_file, 'stream') else image_file
+        image.load()
+        if mode and image.mode != mode:
+            image = image.convert(mode)
+        return image
+    
     @staticmethod
     def process_layered_image(
         image_file,
@@ -48,12 +64,12 @@ class LayeredImageService:
         """
         try:
             layers_applied = []
-            current_image = image_file
-            stego_image_b64 = None
+            current_image = LayeredImageService._decode_once(image_file)
+            watermarked_image = None
             
             # Layer 1: Watermarking FIRST (if watermark text provided)
             if watermark_text:
-                print(f"[Layer 1] Applying Watermarking - Type: {watermark_type}")
+                logger.debug("[Layer 1] Applying Watermarking - Type: %s", watermark_type)
                 
                 if watermark_type == 'text':
                     # Visible text watermark
@@ -61,20 +77,22 @@ class LayeredImageService:
                         current_image,
                         watermark_text,
                         opacity=watermark_opacity,
-                        position=watermark_position
+                        position=watermark_position,
+                        return_image=True
                     )
                 else:
                     # Invisible watermark
                     watermark_result, watermark_status = WatermarkingService.add_invisible_watermark(
                         current_image,
                         watermark_text,
-                        strength=0.1
+                        strength=0.1,
+                        return_image=True
                     )
                 
                 if watermark_status == 200:
-                    watermarked_image_bytes = watermark_result['watermarked_image']
-                    watermarked_image_b64 = base64.b64encode(watermarked_image_bytes).decode('utf-8')
-                    current_image = Image.open(io.BytesIO(watermarked_image_bytes))
+                    # Hand the PIL image straight to the next layer (no PNG round-trip)
+                    watermarked_image = watermark_result['watermarked_image']
+                    current_image = watermarked_image
                     
                     layers_applied.append({
                         'layer': 1,
@@ -83,23 +101,22 @@ class LayeredImageService:
                         'text': watermark_text,
                         'completed': True
                     })
-                    print(f"[Layer 1] ✓ Watermarking completed - Type: {watermark_type}")
+                    logger.debug("[Layer 1] Watermarking completed - Type: %s", watermark_type)
                 else:
                     return create_error_response(f"Watermarking failed: {watermark_result.get('error', 'Unknown error')}")
             
             # Layer 2: Steganography SECOND on top of watermark (if secret message provided)
             if secret_message:
-                print(f"[Layer 2] Applying Steganography - Message: {len(secret_message)} chars")
+                logger.debug("[Layer 2] Applying Steganography - Message: %d chars", len(secret_message))
                 
                 steg_result, steg_status = SteganographyService.embed_message(
                     current_image,
-                    secret_message
+                    secret_message,
+                    return_image=True
                 )
                 
                 if steg_status == 200:
-                    # Convert the encoded image bytes back to base64 for response
-                    stego_image_bytes = steg_result['encoded_image']
-                    final_image_b64 = base64.b64encode(stego_image_bytes).decode('utf-8')
+                    final_image = steg_result['encoded_image']
                     
                     layers_applied.append({
                         'layer': 2 if watermark_text else 1,
@@ -109,16 +126,19 @@ class LayeredImageService:
                         'bits_used': steg_result['bits_used'],
                         'completed': True
                     })
-                    print(f"[Layer 2] ✓ Steganography completed - {steg_result['bits_used']} bits used")
+                    logger.debug("[Layer 2] Steganography completed - %s bits used", steg_result['bits_used'])
                 else:
                     return create_error_response(f"Steganography failed: {steg_result.get('error', 'Unknown error')}")
             else:
                 # No steganography, use watermarked image as final
-                if watermarked_image_b64:
-                    final_image_b64 = watermarked_image_b64
+                if watermarked_image is not None:
+                    final_image = watermarked_image
                 else:
                     return create_error_response("At least one operation must be specified")
             
+            # Serialize to PNG exactly once, for the response
+            final_image_b64 = base64.b64encode(image_to_bytes(final_image, 'PNG')).decode('utf-8')
+            
             return create_success_response({
                 'processed_image': final_image_b64,
                 'layers_applied': layers_applied,
@@ -128,9 +148,7 @@ class LayeredImageService:
             })
             
         except Exception as e:
-            print(f"[ERROR] Image processing failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Image processing failed")
             return create_error_response(f'Image processing failed: {str(e)}')
     
     @staticmethod
@@ -157,21 +175,21 @@ class LayeredImageService:
             extracted_data = {}
             layers_extracted = []
             
-            print(f"\n{'='*60}")
-            print(f"EXTRACTION STARTED")
-            print(f"{'='*60}")
-            print(f"Extract Steganography: {extract_stego}")
-            print(f"Extract Watermark: {extract_watermark}")
-            print(f"Expected Watermark Length: {watermark_length}")
+            # Both extractors work on RGB pixels; decode and convert once for both
+            image_file = LayeredImageService._decode_once(image_file, 'RGB')
+            
+            logger.debug(
+                "Extraction started - steganography: %s, watermark: %s, expected watermark length: %s",
+                extract_stego, extract_watermark, watermark_length
+            )
             
             # Extract steganography FIRST (LSB method - top layer)
             if extract_stego:
-                print(f"\n[1/2] Extracting steganography message (TOP LAYER)...")
+                logger.debug("[1/2] Extracting steganography message (TOP LAYER)")
                 try:
                     steg_result, steg_status = SteganographyService.extract_message(image_file)
                     
-                    print(f"  Status Code: {steg_status}")
-                    print(f"  Result Keys: {steg_result.keys()}")
+                    logger.debug("Steganography status: %s", steg_status)
                     
                     if steg_status == 200 and steg_result.get('success'):
                         message = steg_result.get('message', '')
@@ -182,10 +200,10 @@ class LayeredImageService:
                             'message_length': len(message),
                             'extracted': True
                         })
-                        print(f"  ✓ SUCCESS - Message: '{message}' ({len(message)} chars)")
+                        logger.debug("Steganography extracted (%d chars)", len(message))
                     else:
                         error_msg = steg_result.get('error', 'Unknown error')
-                        print(f"  ✗ FAILED - {error_msg}")
+                        logger.debug("Steganography extraction failed: %s", error_msg)
                         extracted_data['hidden_message'] = None
                         layers_extracted.append({
                             'layer': 'steganography',
@@ -193,9 +211,7 @@ class LayeredImageService:
                             'error': error_msg
                         })
                 except Exception as e:
-                    print(f"  ✗ EXCEPTION - {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Steganography extraction raised")
                     extracted_data['hidden_message'] = None
                     layers_extracted.append({
                         'layer': 'steganography',
@@ -205,7 +221,7 @@ class LayeredImageService:
             
             # Extract invisible watermark SECOND (bottom layer)
             if extract_watermark:
-                print(f"\n[2/2] Extracting watermark (BOTTOM LAYER)...")
+                logger.debug("[2/2] Extracting watermark (BOTTOM LAYER)")
                 try:
                     watermark_result, watermark_status = WatermarkingService.extract_invisible_watermark(
                         image_file,
@@ -213,8 +229,7 @@ class LayeredImageService:
                         strength=0.1
                     )
                     
-                    print(f"  Status Code: {watermark_status}")
-                    print(f"  Result Keys: {watermark_result.keys()}")
+                    logger.debug("Watermark status: %s", watermark_status)
                     
                     if watermark_status == 200 and watermark_result.get('success'):
                         watermark_text = watermark_result.get('extracted_text', '')
@@ -224,10 +239,10 @@ class LayeredImageService:
                             'extracted': True,
                             'confidence': watermark_result.get('confidence', 'low')
                         })
-                        print(f"  ✓ SUCCESS - Watermark: '{watermark_text}'")
+                        logger.debug("Watermark extracted: %r", watermark_text)
                     else:
                         error_msg = watermark_result.get('error', 'Unknown error')
-                        print(f"  ✗ FAILED - {error_msg}")
+                        logger.debug("Watermark extraction failed: %s", error_msg)
                         extracted_data['watermark'] = None
                         layers_extracted.append({
                             'layer': 'watermark',
@@ -235,9 +250,7 @@ class LayeredImageService:
                             'error': error_msg
                         })
                 except Exception as e:
-                    print(f"  ✗ EXCEPTION - {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Watermark extraction raised")
                     extracted_data['watermark'] = None
                     layers_extracted.append({
                         'layer': 'watermark',
@@ -245,10 +258,7 @@ class LayeredImageService:
                         'error': str(e)
                     })
             
-            print(f"\n{'='*60}")
-            print(f"EXTRACTION COMPLETED")
-            print(f"Extracted Data: {extracted_data}")
-            print(f"{'='*60}\n")
+            logger.debug("Extraction completed - layers: %d", len(layers_extracted))
             
             return create_success_response({
                 'extracted_data': extracted_data,
@@ -257,9 +267,5 @@ class LayeredImageService:
             })
             
         except Exception as e:
-            print(f"\n{'='*60}")
-            print(f"[ERROR] Extraction failed: {str(e)}")
-            print(f"{'='*60}\n")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Extraction failed")
             return create_error_response(f'Extraction failed: {str(e)}')
@@ -4,17 +4,169 @@ Provides multi-layer encryption using AES, RSA, Digital Signature, and ECC
 Sequential layering: Plaintext → AES → RSA → ECC → Digital Signature
 """
 
+import os
 import json
-import base64
+import asyncio
+import atexit
+import functools
+import logging
 import time
+import random
 import secrets
+import struct
+import platform
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from .aes_service import AESService
 from .rsa_service import RSAService
 from .ecc_service import ECCService
 from .signature_service import SignatureService
-from .utils import create_success_response, create_error_response
+from .utils import (
+    create_success_response, create_error_response, load_public_key_pem, load_private_key_pem,
+    encode_base64, decode_base64
+)
+
+logger = logging.getLogger(__name__)
+
+# Artificial per-layer delays are for classroom demos only; off unless opted in
+DEMO_PACING = os.environ.get('LEARNCRYPTO_DEMO_PACING', '').lower() in ('1', 'true', 'yes')
+
+# OAEP padding for the RSA layer, built once and shared by every call
+_RSA_OAEP = asym_padding.OAEP(
+    mgf=asym_padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
+_RSA_LAYER_NONCE_SIZE = 12
+
+# AES layer mode: GCM runs blocks in parallel through AES-NI and authenticates
+# in the same pass. Keys from before the switch carry no 'mode' and are CBC.
+AES_LAYER_MODE = 'GCM'
+
+
+# Below this AES-CTR throughput on x86_64, libcrypto is almost certainly not using AES-NI
+AES_NI_MIN_MBPS = 500
+_aes_throughput_checked = False
+
+
+def check_aes_throughput() -> None:
+    """
+    Time AES-256-CTR over 1 MB once per process and warn if it is too slow
+    
+    Every layer rides on the linked libcrypto; one built with no-asm (or one
+    that skips AES-NI) is an order of magnitude slower without any error.
+    Called from app startup.
+    """
+    global _aes_throughput_checked
+    if _aes_throughput_checked:
+        return
+    _aes_throughput_checked = True
+    
+    buffer = bytes(1 << 20)
+    encryptor = Cipher(algorithms.AES(secrets.token_bytes(32)), modes.CTR(secrets.token_bytes(16))).encryptor()
+    start = time.perf_counter()
+    encryptor.update(buffer)
+    elapsed = time.perf_counter() - start
+    mbps = len(buffer) / (1 << 20) / max(elapsed, 1e-9)
+    
+    logger.debug("AES-256-CTR throughput: %.0f MB/s", mbps)
+    if platform.machine().lower() in ('x86_64', 'amd64') and mbps < AES_NI_MIN_MBPS:
+        logger.warning(
+            "AES-NI likely disabled: %.0f MB/s AES-256-CTR - rebuild libcrypto without no-asm", mbps
+        )
+
+
+# Characters of each layer's input/output echoed back in layer_outputs
+LAYER_PREVIEW_CHARS = 200
+
+
+def _layer_io(input_data: str, output_data: str, verbose: bool) -> Dict[str, Any]:
+    """Input/output fields for a layer_outputs entry: full buffers if verbose, else previews"""
+    if verbose:
+        return {'input': input_data, 'output': output_data}
+    return {
+        'input_preview': input_data[:LAYER_PREVIEW_CHARS],
+        'input_size': len(input_data),
+        'output_preview': output_data[:LAYER_PREVIEW_CHARS],
+        'output_size': len(output_data)
+    }
+
+
+def _demo_pause(base: float, jitter_ms: int) -> None:
+    """Sleep base seconds plus random jitter when demo pacing is enabled"""
+    if DEMO_PACING:
+        time.sleep(base + random.random() * jitter_ms / 1000)
+
+
+def _rsa_step(data: str, data_bytes: bytes, keys: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
+    """RSA layer: output is the hybrid RSA ciphertext"""
+    encrypted_text, success = LayeredEncryptionService.encrypt_layer_rsa(data_bytes, keys['rsa']['public_key'])
+    return success, encrypted_text, {}
+
+
+def _signature_step(data: str, data_bytes: bytes, keys: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
+    """Signature layer: data passes through unchanged"""
+    signed_result, success = LayeredEncryptionService.encrypt_layer_signature(data_bytes, keys['signature']['private_key'])
+    if not success:
+        return False, data, {}
+    
+    # Store ONLY the signature, separately in keys for later verification;
+    # it is verified during decryption but never embedded in the data
+    signature_value = signed_result['signature']
+    keys['signature']['stored_signature'] = signature_value
+    
+    return True, data, {
+        'signature': signature_value[:50] + '...',
+        'note': 'Signature stored separately - data unchanged'
+    }
+
+
+def _aes_step(data: str, data_bytes: bytes, keys: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
+    """AES layer: output is the ciphertext; IV and mode are stored in keys for decryption"""
+    encrypted_result, success = LayeredEncryptionService.encrypt_layer_aes(data_bytes, keys['aes']['key'])
+    if not success:
+        return False, data, {}
+    
+    keys['aes']['iv'] = encrypted_result['iv']
+    keys['aes']['mode'] = AES_LAYER_MODE
+    
+    return True, encrypted_result['ciphertext'], {'iv': encrypted_result['iv'][:32] + '...'}
+
+
+# Define the SIMPLIFIED order for layered encryption: RSA → Signature → AES
+LAYER_ORDER = ('rsa', 'signature', 'aes')
+
+# encrypt_layered dispatch: algorithm -> (step, display name, key size, failure message).
+# Each step returns (success, output text, extra layer_outputs fields).
+_ENCRYPT_LAYER_STEPS = {
+    'rsa': (_rsa_step, 'RSA-2048', '2048 bits', 'RSA encryption failed'),
+    'signature': (_signature_step, 'RSA-SHA256 Signature', '2048 bits', 'Digital signature failed'),
+    'aes': (_aes_step, f'AES-256-{AES_LAYER_MODE}', '256 bits', 'AES encryption failed')
+}
+
+
+# Worker processes for batch encryption, created on first use and shut down at exit
+_batch_executor = None
+
+
+def _get_batch_executor() -> ProcessPoolExecutor:
+    """Shared process pool for encrypt_layered_batch (RSA/AES work is CPU-bound)"""
+    global _batch_executor
+    if _batch_executor is None:
+        _batch_executor = ProcessPoolExecutor()
+        # Reap the workers at interpreter exit (e.g. under the Flask reloader)
+        atexit.register(_batch_executor.shutdown)
+    return _batch_executor
+
+
+def _encrypt_batch_item(plaintext: str, keys: Dict[str, Any], layers: List[str], verbose: bool) -> Dict[str, Any]:
+    """Picklable per-item entry point for the batch process pool"""
+    return LayeredEncryptionService.encrypt_layered(plaintext, layers, keys, verbose)
 
 
 class LayeredEncryptionService:
@@ -22,204 +174,178 @@ class LayeredEncryptionService:
     
     @staticmethod
     def generate_all_keys(layers: List[str]) -> Dict[str, Any]:
-        """Generate keys for all required algorithms"""
+        """Generate keys for all required algorithms (asymmetric keypairs concurrently)"""
         keys = {}
         
-        if 'aes' in layers:
-            # AES just needs a random key (32 bytes = 256 bits for AES-256)
-            aes_key = secrets.token_hex(32)  # 64 hex chars = 32 bytes
-            keys['aes'] = {
-                'key': aes_key,
-                'key_size': 256
-            }
-        
-        if 'rsa' in layers:
-            rsa_result, _ = RSAService.generate_keypair(key_size=2048)
-            if rsa_result.get('success'):
-                keys['rsa'] = {
-                    'public_key': rsa_result['public_key'],
-                    'private_key': rsa_result['private_key'],
-                    'key_size': 2048
-                }
-        
-        if 'ecc' in layers:
-            ecc_result, _ = ECCService.generate_keypair()
-            if ecc_result.get('success'):
-                keys['ecc'] = {
-                    'public_key': ecc_result['public_key'],
-                    'private_key': ecc_result['private_key'],
-                    'curve': ecc_result.get('curve', 'secp256r1')
-                }
-        
-        if 'signature' in layers:
-            sig_result, _ = RSAService.generate_keypair(key_size=2048)
-            if sig_result.get('success'):
-                keys['signature'] = {
-                    'public_key': sig_result['public_key'],
-                    'private_key': sig_result['private_key'],
-                    'key_size': 2048
+        # RSA/ECC key generation spends its time in OpenSSL with the GIL
+        # released, so the independent keypairs are generated side by side
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            rsa_future = executor.submit(RSAService.generate_keypair, key_size=2048) if 'rsa' in layers else None
+            sig_future = executor.submit(RSAService.generate_keypair, key_size=2048) if 'signature' in layers else None
+            ecc_future = executor.submit(ECCService.generate_keypair) if 'ecc' in layers else None
+            
+            if 'aes' in layers:
+                # AES just needs a random key (32 bytes = 256 bits for AES-256)
+                aes_key = secrets.token_hex(32)  # 64 hex chars = 32 bytes
+                keys['aes'] = {
+                    'key': aes_key,
+                    'key_size': 256
                 }
+            
+            if rsa_future is not None:
+                rsa_result, _ = rsa_future.result()
+                if rsa_result.get('success'):
+                    keys['rsa'] = {
+                        'public_key': rsa_result['public_key'],
+                        'private_key': rsa_result['private_key'],
+                        'key_size': 2048
+                    }
+            
+            if ecc_future is not None:
+                ecc_result, _ = ecc_future.result()
+                if ecc_result.get('success'):
+                    keys['ecc'] = {
+                        'public_key': ecc_result['public_key'],
+                        'private_key': ecc_result['private_key'],
+                        'curve': ecc_result.get('curve', 'secp256r1')
+                    }
+            
+            if sig_future is not None:
+                sig_result, _ = sig_future.result()
+                if sig_result.get('success'):
+                    keys['signature'] = {
+                        'public_key': sig_result['public_key'],
+                        'private_key': sig_result['private_key'],
+                        'key_size': 2048
+                    }
         
         return keys
     
     @staticmethod
-    def encrypt_layer_aes(data: str, key: str) -> Tuple[Dict[str, Any], bool]:
-        """Encrypt data using AES"""
+    def encrypt_layer_aes(data, key: str, mode: str = AES_LAYER_MODE) -> Tuple[Dict[str, Any], bool]:
+        """Encrypt data using AES (GCM by default; the tag is appended to the ciphertext)"""
         try:
-            time.sleep(0.05 + (hash(data) % 150) / 1000)
-            result, status = AESService.encrypt(data, key, mode='CBC', key_size=256)
+            _demo_pause(0.05, 150)
+            result, status = AESService.encrypt(data, key, mode=mode, key_size=256)
             if result.get('success'):
                 return result, True
             return {}, False
-        except Exception as e:
-            print(f"AES error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("AES error")
             return {}, False
     
     @staticmethod
-    def decrypt_layer_aes(ciphertext: str, key: str, iv: str) -> Tuple[str, bool]:
+    def decrypt_layer_aes(ciphertext: str, key: str, iv: str, mode: str = AES_LAYER_MODE) -> Tuple[str, bool]:
         """Decrypt AES encrypted data"""
         try:
-            time.sleep(0.05 + (hash(ciphertext) % 150) / 1000)
-            result, status = AESService.decrypt(ciphertext, key, mode='CBC', key_size=256, iv=iv)
+            _demo_pause(0.05, 150)
+            result, status = AESService.decrypt(ciphertext, key, mode=mode, key_size=256, iv=iv)
             if result.get('success'):
                 return result['plaintext'], True
             return "", False
-        except Exception as e:
-            print(f"AES decryption error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("AES decryption error")
             return "", False
     
     @staticmethod
-    def encrypt_layer_rsa(data: str, public_key: str) -> Tuple[str, bool]:
-        """Encrypt data using RSA with chunking for large data"""
+    def encrypt_layer_rsa(data, public_key: str) -> Tuple[str, bool]:
+        """
+        Encrypt data using hybrid RSA (RSA-OAEP wraps an AES-256-GCM session key)
+        
+        RSA can only encrypt ~214 bytes per operation with a 2048-bit key, so the
+        payload itself is encrypted once with AES-GCM and only the 32-byte
+        session key goes through RSA. Output is a single base64 blob of
+        len(wrapped_key) as 2 big-endian bytes || wrapped_key || nonce || ciphertext.
+        """
         try:
-            time.sleep(0.1 + (hash(data) % 200) / 1000)
-            
-            # RSA can only encrypt limited data (key_size/8 - padding)
-            # For 2048-bit key: max ~214 bytes
-            # We'll chunk the data and encrypt each chunk
-            
-            from cryptography.hazmat.primitives import serialization
-            from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
-            from cryptography.hazmat.primitives import hashes
-            import base64
+            _demo_pause(0.1, 200)
             
-            # Load public key to get key size
-            public_key_obj = serialization.load_pem_public_key(public_key.encode('utf-8'))
-            key_size = public_key_obj.key_size
-            max_chunk_size = (key_size // 8) - 2 * (256 // 8) - 2  # OAEP padding overhead (~214 bytes for 2048-bit)
+            public_key_obj = load_public_key_pem(public_key)
             
-            # Convert data to bytes
-            data_bytes = data.encode('utf-8')
+            # Encrypt the payload with a fresh session key
+            session_key = secrets.token_bytes(32)
+            nonce = secrets.token_bytes(_RSA_LAYER_NONCE_SIZE)
+            data_bytes = data if isinstance(data, (bytes, bytearray)) else data.encode('utf-8')
+            ciphertext = AESGCM(session_key).encrypt(nonce, data_bytes, None)
             
-            # Split into chunks
-            chunks = []
-            for i in range(0, len(data_bytes), max_chunk_size):
-                chunk = data_bytes[i:i + max_chunk_size]
-                
-                # Encrypt chunk
-                encrypted_chunk = public_key_obj.encrypt(
-                    chunk,
-                    asym_padding.OAEP(
-                        mgf=asym_padding.MGF1(algorithm=hashes.SHA256()),
-                        algorithm=hashes.SHA256(),
-                        label=None
-                    )
-                )
-                
-                # Encode to base64
-                chunks.append(base64.b64encode(encrypted_chunk).decode('utf-8'))
+            # Wrap the session key with RSA-OAEP
+            wrapped_key = public_key_obj.encrypt(session_key, _RSA_OAEP)
             
-            # Join chunks with separator
-            encrypted_text = '|||'.join(chunks)
+            blob = struct.pack('>H', len(wrapped_key)) + wrapped_key + nonce + ciphertext
+            encrypted_text = encode_base64(blob)
             
             return encrypted_text, True
-        except Exception as e:
-            print(f"RSA error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("RSA error")
             return "", False
     
     @staticmethod
     def decrypt_layer_rsa(ciphertext: str, private_key: str) -> Tuple[str, bool]:
-        """Decrypt RSA encrypted data (with chunking support)"""
+        """Decrypt hybrid RSA data (also accepts the older '|||'-joined RSA chunks)"""
         try:
-            time.sleep(0.1 + (hash(ciphertext) % 200) / 1000)
-            
-            from cryptography.hazmat.primitives import serialization
-            from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
-            from cryptography.hazmat.primitives import hashes
-            import base64
+            _demo_pause(0.1, 200)
             
             # Load private key
-            private_key_obj = serialization.load_pem_private_key(
-                private_key.encode('utf-8'),
-                password=None
-            )
-            
-            # Split chunks
-            chunks = ciphertext.split('|||')
-            decrypted_chunks = []
-            
-            for chunk in chunks:
-                # Decode from base64
-                encrypted_bytes = base64.b64decode(chunk)
-                
-                # Decrypt chunk
-                decrypted_chunk = private_key_obj.decrypt(
-                    encrypted_bytes,
-                    asym_padding.OAEP(
-                        mgf=asym_padding.MGF1(algorithm=hashes.SHA256()),
-                        algorithm=hashes.SHA256(),
-                        label=None
-                    )
+            private_key_obj = load_private_key_pem(private_key)
+            
+            blob = None if '|||' in ciphertext else decode_base64(ciphertext)
+            
+            # A lone legacy chunk is exactly one RSA block; hybrid blobs are longer
+            if blob is not None and len(blob) != private_key_obj.key_size // 8:
+                # Unwrap the session key, then decrypt the payload once
+                (wrapped_len,) = struct.unpack_from('>H', blob)
+                nonce_start = 2 + wrapped_len
+                payload_start = nonce_start + _RSA_LAYER_NONCE_SIZE
+                session_key = private_key_obj.decrypt(blob[2:nonce_start], _RSA_OAEP)
+                plaintext_bytes = AESGCM(session_key).decrypt(
+                    blob[nonce_start:payload_start],
+                    blob[payload_start:],
+                    None
                 )
-                
-                decrypted_chunks.append(decrypted_chunk)
-            
-            # Join all decrypted chunks
-            plaintext = b''.join(decrypted_chunks).decode('utf-8')
-            
-            return plaintext, True
-        except Exception as e:
-            print(f"RSA decryption error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            else:
+                # Ciphertext from before hybrid encryption: one RSA block per chunk.
+                # The chunks are independent and OpenSSL releases the GIL, so
+                # decrypt them on a thread pool
+                chunks = [decode_base64(chunk) for chunk in ciphertext.split('|||')]
+                workers = min(len(chunks), os.cpu_count() or 1)
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        decrypted_chunks = list(executor.map(lambda chunk: private_key_obj.decrypt(chunk, _RSA_OAEP), chunks))
+                else:
+                    decrypted_chunks = [private_key_obj.decrypt(chunk, _RSA_OAEP) for chunk in chunks]
+                plaintext_bytes = b''.join(decrypted_chunks)
+            
+            return plaintext_bytes.decode('utf-8'), True
+        except Exception:
+            logger.exception("RSA decryption error")
             return "", False
     
     @staticmethod
-    def encrypt_layer_signature(data: str, private_key: str) -> Tuple[Dict[str, Any], bool]:
-        """Sign data using RSA digital signature"""
+    def encrypt_layer_signature(data, private_key: str) -> Tuple[Dict[str, Any], bool]:
+        """Sign data using RSA digital signature (the data itself passes through unchanged)"""
         try:
-            time.sleep(0.08 + (hash(data) % 120) / 1000)
+            _demo_pause(0.08, 120)
             result, status = RSAService.sign(data, private_key)
             if result.get('success'):
-                signed_data = {
-                    'data': data,
+                return {
                     'signature': result['signature'],
                     'algorithm': 'RSA-SHA256'
-                }
-                return signed_data, True
+                }, True
             return {}, False
-        except Exception as e:
-            print(f"Signature error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Signature error")
             return {}, False
     
     @staticmethod
     def decrypt_layer_signature(signed_data: Dict[str, Any], public_key: str) -> Tuple[str, bool]:
         """Verify signature and extract data"""
         try:
-            time.sleep(0.08 + (hash(signed_data['signature']) % 120) / 1000)
+            _demo_pause(0.08, 120)
             
-            print(f"DEBUG decrypt_layer_signature:")
-            print(f"  - Data to verify (first 100): {signed_data['data'][:100]}")
-            print(f"  - Signature (first 100): {signed_data['signature'][:100]}")
-            print(f"  - Public key (first 100): {public_key[:100]}")
+            logger.debug(
+                "decrypt_layer_signature - data: %.100s, signature: %.100s, public key: %.100s",
+                signed_data['data'], signed_data['signature'], public_key
+            )
             
             result, status = RSAService.verify(
                 signed_data['data'],
@@ -227,24 +353,22 @@ class LayeredEncryptionService:
                 public_key
             )
             
-            print(f"  - Verification result: {result}")
+            logger.debug("Verification result: %s", result)
             
             if result.get('success') and result.get('valid'):
                 return signed_data['data'], True
             
-            print(f"  - Verification FAILED: success={result.get('success')}, valid={result.get('valid')}")
+            logger.debug("Verification FAILED: success=%s, valid=%s", result.get('success'), result.get('valid'))
             return "", False
-        except Exception as e:
-            print(f"Signature verification error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Signature verification error")
             return "", False
     
     @staticmethod
     def encrypt_layer_ecc(data: str, private_key: str) -> Tuple[Dict[str, Any], bool]:
         """Sign data using ECC (ECDSA)"""
         try:
-            time.sleep(0.06 + (hash(data) % 90) / 1000)
+            _demo_pause(0.06, 90)
             result, status = ECCService.sign(data, private_key)
             if result.get('success'):
                 signed_data = {
@@ -255,17 +379,15 @@ class LayeredEncryptionService:
                 }
                 return signed_data, True
             return {}, False
-        except Exception as e:
-            print(f"ECC signing error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("ECC signing error")
             return {}, False
     
     @staticmethod
     def decrypt_layer_ecc(signed_data: Dict[str, Any], public_key: str) -> Tuple[str, bool]:
         """Verify ECC signature (ECDSA) and extract data"""
         try:
-            time.sleep(0.06 + (hash(signed_data['signature']) % 90) / 1000)
+            _demo_pause(0.06, 90)
             result, status = ECCService.verify(
                 signed_data['data'],
                 signed_data['signature'],
@@ -274,14 +396,12 @@ class LayeredEncryptionService:
             if result.get('success') and result.get('valid'):
                 return signed_data['data'], True
             return "", False
-        except Exception as e:
-            print(f"ECC signature verification error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("ECC signature verification error")
             return "", False
     
     @staticmethod
-    def encrypt_layered(plaintext: str, layers: List[str], keys: Dict[str, Any] = None) -> Dict[str, Any]:
+    def encrypt_layered(plaintext: str, layers: List[str], keys: Dict[str, Any] = None, verbose: bool = False) -> Dict[str, Any]:
         """
         Encrypt text through multiple layers SEQUENTIALLY
         Simplified Order: RSA → Digital Signature → AES
@@ -290,177 +410,107 @@ class LayeredEncryptionService:
             plaintext: Original text to encrypt
             layers: List of algorithm names (will be applied in fixed order)
             keys: Pre-generated keys (optional)
+            verbose: Include each layer's full input/output instead of previews
             
         Returns:
             Dictionary with encrypted data showing output after EACH layer
         """
         try:
+            # Sort the layers according to the defined order
+            layer_set = frozenset(layers)
+            ordered_layers = [layer for layer in LAYER_ORDER if layer in layer_set]
+            
+            # Nothing to apply: the plaintext is the output, no keys are needed
+            if not ordered_layers:
+                return {
+                    'success': True,
+                    'encrypted_data': plaintext,
+                    'layers': [],
+                    'layer_outputs': [],
+                    'encryption_steps': [],
+                    'layer_metadata': [],
+                    'keys': keys or {},
+                    'total_layers': 0,
+                    'final_size': len(plaintext),
+                    'timestamp': datetime.now().isoformat(timespec='microseconds'),
+                    'nonce': secrets.token_hex(16),
+                    'layer_order': 'RSA → Digital Signature → AES'
+                }
+            
             # Generate keys if not provided
             if not keys:
                 keys = LayeredEncryptionService.generate_all_keys(layers)
             
-            # Define the SIMPLIFIED order for layered encryption: RSA → Signature → AES
-            LAYER_ORDER = ['rsa', 'signature', 'aes']
-            
-            # Sort the layers according to the defined order
-            ordered_layers = [layer for layer in LAYER_ORDER if layer in layers]
-            
             current_data = plaintext
-            encryption_steps = []
-            layer_outputs = []  # Store actual output after each layer
-            layer_metadata = []
+            # Encoded form of current_data, produced once per layer output and
+            # handed to the next layers so none of them re-encode the text
+            current_bytes = plaintext.encode('utf-8')
+            # One slot per layer, filled in by index
+            layer_count = len(ordered_layers)
+            encryption_steps = [None] * layer_count
+            layer_outputs = [None] * layer_count  # Store actual output after each layer
+            layer_metadata = [None] * layer_count
             
-            print(f"\n{'='*70}")
-            print(f"STARTING LAYERED ENCRYPTION")
-            print(f"Original Plaintext: {plaintext}")
-            print(f"Layers to apply (in order): {' → '.join([l.upper() for l in ordered_layers])}")
-            print(f"{'='*70}\n")
+            logger.debug("Starting layered encryption - layers (in order): %s", ordered_layers)
             
             for i, algorithm in enumerate(ordered_layers):
                 step_num = i + 1
                 input_data = current_data
+                step, display_name, key_size_label, failure = _ENCRYPT_LAYER_STEPS[algorithm]
                 
-                print(f"\n{'='*70}")
-                print(f"LAYER {step_num}/{len(ordered_layers)}: {algorithm.upper()} ENCRYPTION")
-                print(f"Input length: {len(input_data)} chars")
-                print(f"Input preview: {input_data[:80]}..." if len(input_data) > 80 else f"Input: {input_data}")
+                logger.debug(
+                    "Layer %d/%d: %s encryption - input %d chars: %.80s",
+                    step_num, len(ordered_layers), algorithm.upper(), len(input_data), input_data
+                )
                 
-                if algorithm == 'rsa':
-                    encrypted_text, success = LayeredEncryptionService.encrypt_layer_rsa(
-                        current_data,
-                        keys['rsa']['public_key']
-                    )
-                    if not success:
-                        return {
-                            'success': False,
-                            'error': f'RSA encryption failed at layer {step_num}'
-                        }
-                    
-                    # RSA output is the encrypted text
-                    current_data = encrypted_text
-                    
-                    layer_outputs.append({
-                        'layer': step_num,
-                        'algorithm': 'RSA-2048',
-                        'input': input_data,
-                        'output': current_data,
-                        'key_size': '2048 bits'
-                    })
-                    
-                    layer_metadata.append({
-                        'layer': step_num,
-                        'algorithm': 'RSA-2048',
-                        'input_size': len(input_data),
-                        'output_size': len(current_data),
-                        'key_size': '2048 bits'
-                    })
-                    
-                    print(f"✓ RSA encryption complete")
-                    print(f"Output length: {len(current_data)} chars")
-                    print(f"Output preview: {current_data[:80]}..." if len(current_data) > 80 else f"Output: {current_data}")
-                    
-                elif algorithm == 'signature':
-                    signed_result, success = LayeredEncryptionService.encrypt_layer_signature(
-                        current_data,
-                        keys['signature']['private_key']
-                    )
-                    if not success:
-                        return {
-                            'success': False,
-                            'error': f'Digital signature failed at layer {step_num}'
-                        }
-                    
-                    # Store ONLY the signature in metadata, keep data clean
-                    # The signature will be verified during decryption but not embedded in the data
-                    signature_value = signed_result['signature']
-                    
-                    # Store signature separately in keys for later verification
-                    keys['signature']['stored_signature'] = signature_value
-                    
-                    # DON'T modify current_data - just pass it through
-                    # current_data stays as the RSA encrypted text
-                    
-                    layer_outputs.append({
-                        'layer': step_num,
-                        'algorithm': 'RSA-SHA256 Signature',
-                        'input': input_data,
-                        'output': current_data,  # Output is same as input (signature is stored separately)
-                        'signature': signature_value[:50] + '...',
-                        'key_size': '2048 bits',
-                        'note': 'Signature stored separately - data unchanged'
-                    })
-                    
-                    layer_metadata.append({
-                        'layer': step_num,
-                        'algorithm': 'RSA-SHA256 Signature',
-                        'input_size': len(input_data),
-                        'output_size': len(current_data),
-                        'key_size': '2048 bits'
-                    })
-                    
-                    print(f"✓ Digital signature complete")
-                    print(f"Signature generated and stored separately")
-                    print(f"Output length: {len(current_data)} chars (unchanged - signature not embedded)")
-                    print(f"Output preview: {current_data[:80]}..." if len(current_data) > 80 else f"Output: {current_data}")
-                    
-                elif algorithm == 'aes':
-                    encrypted_result, success = LayeredEncryptionService.encrypt_layer_aes(
-                        current_data,
-                        keys['aes']['key']
-                    )
-                    if not success:
-                        return {
-                            'success': False,
-                            'error': f'AES encryption failed at layer {step_num}'
-                        }
-                    
-                    # Store the IV in keys for decryption
-                    keys['aes']['iv'] = encrypted_result['iv']
-                    
-                    # AES output is the ciphertext
-                    current_data = encrypted_result['ciphertext']
-                    
-                    layer_outputs.append({
-                        'layer': step_num,
-                        'algorithm': 'AES-256-CBC',
-                        'input': input_data,
-                        'output': current_data,
-                        'iv': encrypted_result['iv'][:32] + '...',
-                        'key_size': '256 bits'
-                    })
-                    
-                    layer_metadata.append({
-                        'layer': step_num,
-                        'algorithm': 'AES-256-CBC',
-                        'input_size': len(input_data),
-                        'output_size': len(current_data),
-                        'key_size': '256 bits'
-                    })
-                    
-                    print(f"✓ AES encryption complete")
-                    print(f"Output length: {len(current_data)} chars")
-                    print(f"Output preview: {current_data[:80]}..." if len(current_data) > 80 else f"Output: {current_data}")
+                success, output_data, extra_fields = step(current_data, current_bytes, keys)
+                if not success:
+                    return {
+                        'success': False,
+                        'error': f'{failure} at layer {step_num}'
+                    }
+                
+                if output_data is not current_data:
+                    current_data = output_data
+                    current_bytes = output_data.encode('ascii')
                 
-                encryption_steps.append({
+                layer_outputs[i] = {
+                    'layer': step_num,
+                    'algorithm': display_name,
+                    **_layer_io(input_data, current_data, verbose),
+                    **extra_fields,
+                    'key_size': key_size_label
+                }
+                
+                layer_metadata[i] = {
+                    'layer': step_num,
+                    'algorithm': display_name,
+                    'input_size': len(input_data),
+                    'output_size': len(current_data),
+                    'key_size': key_size_label
+                }
+                
+                encryption_steps[i] = {
                     'step': step_num,
                     'algorithm': algorithm,
                     'completed': True
-                })
-                print(f"{'='*70}\n")
+                }
+                
+                logger.debug("%s complete - output %d chars: %.80s", display_name, len(current_data), current_data)
             
-            # Add timestamp and nonce for uniqueness
+            # Add timestamp and nonce for uniqueness. The nonce is display-only,
+            # so reuse the AES layer's fresh random IV (same 32 hex chars) when there is one
             timestamp = datetime.now().isoformat(timespec='microseconds')
-            nonce = secrets.token_hex(16)
+            aes_iv = keys.get('aes', {}).get('iv') if 'aes' in ordered_layers else None
+            nonce = decode_base64(aes_iv).hex() if aes_iv else secrets.token_hex(16)
             
             # Final encrypted data
             final_encrypted_data = current_data
             
-            print(f"\n{'='*70}")
-            print(f"ENCRYPTION COMPLETE!")
-            print(f"Total layers applied: {len(ordered_layers)}")
-            print(f"Final output length: {len(final_encrypted_data)} chars")
-            print(f"Unique ID (nonce): {nonce[:16]}...")
-            print(f"{'='*70}\n")
+            logger.debug(
+                "Encryption complete - %d layers, final output %d chars",
+                len(ordered_layers), len(final_encrypted_data)
+            )
             
             return {
                 'success': True,
@@ -478,13 +528,69 @@ class LayeredEncryptionService:
             }
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Layered encryption failed")
             return {
                 'success': False,
                 'error': f'Layered encryption failed: {str(e)}'
             }
     
+    @staticmethod
+    def encrypt_layered_batch(
+        plaintexts: List[str],
+        layers: List[str],
+        keys_per_item: List[Dict[str, Any]] = None,
+        verbose: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Encrypt many independent plaintexts in parallel worker processes
+        
+        Args:
+            plaintexts: Texts to encrypt
+            layers: List of algorithm names, shared by every item
+            keys_per_item: Pre-generated keys per plaintext (optional; items
+                without keys get their own)
+            verbose: Include each layer's full input/output instead of previews
+            
+        Returns:
+            List of encrypt_layered results, in input order
+        """
+        if keys_per_item is None:
+            keys_per_item = [None] * len(plaintexts)
+        if len(keys_per_item) != len(plaintexts):
+            return [{
+                'success': False,
+                'error': 'keys_per_item must have one entry per plaintext'
+            } for _ in plaintexts]
+        
+        worker = functools.partial(_encrypt_batch_item, layers=layers, verbose=verbose)
+        if len(plaintexts) < 2:
+            return [worker(plaintext, keys) for plaintext, keys in zip(plaintexts, keys_per_item)]
+        return list(_get_batch_executor().map(worker, plaintexts, keys_per_item))
+    
+    @staticmethod
+    async def encrypt_layered_batch_async(
+        plaintexts: List[str],
+        layers: List[str],
+        keys_per_item: List[Dict[str, Any]] = None,
+        verbose: bool = False
+    ) -> List[Dict[str, Any]]:
+        """encrypt_layered_batch for async handlers: awaits the process pool without blocking the event loop"""
+        if keys_per_item is None:
+            keys_per_item = [None] * len(plaintexts)
+        if len(keys_per_item) != len(plaintexts):
+            return [{
+                'success': False,
+                'error': 'keys_per_item must have one entry per plaintext'
+            } for _ in plaintexts]
+        
+        loop = asyncio.get_running_loop()
+        executor = _get_batch_executor()
+        worker = functools.partial(_encrypt_batch_item, layers=layers, verbose=verbose)
+        return list(await asyncio.gather(*(
+            loop.run_in_executor(executor, worker, plaintext, keys)
+            for plaintext, keys in zip(plaintexts, keys_per_item)
+        )))
+    
     @staticmethod
     def decrypt_layered(encrypted_data: str, layers: List[str], keys: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -500,29 +606,24 @@ class LayeredEncryptionService:
             Dictionary with decrypted data and metadata
         """
         try:
-            # Define the SIMPLIFIED order: RSA → Signature → AES
-            # Decryption is in REVERSE: AES → Signature → RSA
-            LAYER_ORDER = ['rsa', 'signature', 'aes']
-            
+            # Decryption is in REVERSE of LAYER_ORDER: AES → Signature → RSA
             # Sort the layers according to the defined order, then reverse for decryption
-            ordered_layers = [layer for layer in LAYER_ORDER if layer in layers]
+            layer_set = frozenset(layers)
+            ordered_layers = [layer for layer in LAYER_ORDER if layer in layer_set]
             reversed_layers = list(reversed(ordered_layers))
             
             current_data = encrypted_data
-            decryption_steps = []
+            decryption_steps = [None] * len(reversed_layers)
             
-            print(f"\n{'='*70}")
-            print(f"STARTING LAYERED DECRYPTION")
-            print(f"Layers to decrypt (in reverse): {' → '.join([l.upper() for l in reversed_layers])}")
-            print(f"{'='*70}\n")
+            logger.debug("Starting layered decryption - layers (in reverse): %s", reversed_layers)
             
             for i, algorithm in enumerate(reversed_layers):
                 step_num = i + 1
                 
-                print(f"\n{'='*70}")
-                print(f"DECRYPT LAYER {step_num}/{len(reversed_layers)}: {algorithm.upper()}")
-                print(f"Input length: {len(current_data)} chars")
-                print(f"Input preview: {current_data[:80]}..." if len(current_data) > 80 else f"Input: {current_data}")
+                logger.debug(
+                    "Decrypt layer %d/%d: %s - input %d chars: %.80s",
+                    step_num, len(reversed_layers), algorithm.upper(), len(current_data), current_data
+                )
                 
                 if algorithm == 'aes':
                     # AES decryption
@@ -530,7 +631,8 @@ class LayeredEncryptionService:
                         decrypted, success = LayeredEncryptionService.decrypt_layer_aes(
                             current_data,
                             keys['aes']['key'],
-                            keys['aes']['iv']
+                            keys['aes']['iv'],
+                            keys['aes'].get('mode', 'CBC')
                         )
                         if not success:
                             return {
@@ -544,9 +646,7 @@ class LayeredEncryptionService:
                             'error': 'AES IV not found in keys'
                         }
                     
-                    print(f"✓ AES decryption successful")
-                    print(f"Output length: {len(current_data)} chars")
-                    print(f"Output preview: {current_data[:80]}..." if len(current_data) > 80 else f"Output: {current_data}")
+                    logger.debug("AES decryption successful - output %d chars", len(current_data))
                 
                 elif algorithm == 'signature':
                     # Verify the signature that was stored separately during encryption
@@ -573,9 +673,7 @@ class LayeredEncryptionService:
                             'error': 'Signature not found in keys'
                         }
                     
-                    print(f"✓ Signature verified successfully")
-                    print(f"Output length: {len(current_data)} chars")
-                    print(f"Output preview: {current_data[:80]}..." if len(current_data) > 80 else f"Output: {current_data}")
+                    logger.debug("Signature verified successfully - output %d chars", len(current_data))
                     
                 elif algorithm == 'rsa':
                     # RSA decryption
@@ -590,21 +688,15 @@ class LayeredEncryptionService:
                         }
                     current_data = decrypted
                     
-                    print(f"✓ RSA decryption successful")
-                    print(f"Output length: {len(current_data)} chars")
-                    print(f"Output: {current_data}")
+                    logger.debug("RSA decryption successful - output %d chars", len(current_data))
                 
-                decryption_steps.append({
+                decryption_steps[i] = {
                     'step': step_num,
                     'algorithm': algorithm,
                     'completed': True
-                })
-                print(f"{'='*70}\n")
+                }
             
-            print(f"\n{'='*70}")
-            print(f"DECRYPTION COMPLETE!")
-            print(f"Original plaintext recovered: {current_data}")
-            print(f"{'='*70}\n")
+            logger.debug("Decryption complete - %d layers", len(reversed_layers))
             
             return {
                 'success': True,
@@ -614,8 +706,7 @@ class LayeredEncryptionService:
             }
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Layered decryption failed")
             return {
                 'success': False,
                 'error': f'Layered decryption failed: {str(e)}'
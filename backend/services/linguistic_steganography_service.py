@@ -4,10 +4,22 @@ Uses synonym substitution in cover text to hide messages efficiently
 """
 
 import base64
+import logging
 import random
-import re
 from typing import Dict, Tuple, List
 
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Deletes every ASCII character that is not alphanumeric or underscore, so
+# word.translate(_PUNCT_TABLE) strips punctuation in one C-level pass
+_PUNCT_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c == '_')
+))
+
+# Bit offsets of the four 2-bit synonym indices in a byte, most significant first
+_INDEX_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
 
 class LinguisticSteganographyService:
     """Service for hiding messages using linguistic steganography with cover text"""
@@ -15,28 +27,45 @@ class LinguisticSteganographyService:
     # Synonym groups for 2-bit encoding (4 synonyms per group)
     # Each group encodes 2 bits: 00, 01, 10, 11
     SYNONYM_GROUPS = {
-        'good': ['good', 'great', 'excellent', 'fine'],
-        'bad': ['bad', 'poor', 'terrible', 'awful'],
-        'big': ['big', 'large', 'huge', 'giant'],
-        'small': ['small', 'tiny', 'little', 'mini'],
-        'fast': ['fast', 'quick', 'rapid', 'swift'],
-        'easy': ['easy', 'simple', 'basic', 'plain'],
-        'hard': ['hard', 'difficult', 'tough', 'complex'],
-        'new': ['new', 'recent', 'fresh', 'modern'],
-        'old': ['old', 'ancient', 'aged', 'dated'],
-        'start': ['start', 'begin', 'launch', 'initiate'],
-        'end': ['end', 'finish', 'complete', 'conclude'],
-        'make': ['make', 'create', 'build', 'produce'],
-        'find': ['find', 'discover', 'locate', 'detect'],
-        'think': ['think', 'ponder', 'consider', 'reflect'],
-        'know': ['know', 'understand', 'grasp', 'comprehend'],
-        'want': ['want', 'desire', 'wish', 'need'],
-        'help': ['help', 'assist', 'aid', 'support'],
-        'work': ['work', 'function', 'operate', 'perform'],
-        'use': ['use', 'employ', 'utilize', 'apply'],
-        'give': ['give', 'provide', 'offer', 'supply'],
+        'good': ('good', 'great', 'excellent', 'fine'),
+        'bad': ('bad', 'poor', 'terrible', 'awful'),
+        'big': ('big', 'large', 'huge', 'giant'),
+        'small': ('small', 'tiny', 'little', 'mini'),
+        'fast': ('fast', 'quick', 'rapid', 'swift'),
+        'easy': ('easy', 'simple', 'basic', 'plain'),
+        'hard': ('hard', 'difficult', 'tough', 'complex'),
+        'new': ('new', 'recent', 'fresh', 'modern'),
+        'old': ('old', 'ancient', 'aged', 'dated'),
+        'start': ('start', 'begin', 'launch', 'initiate'),
+        'end': ('end', 'finish', 'complete', 'conclude'),
+        'make': ('make', 'create', 'build', 'produce'),
+        'find': ('find', 'discover', 'locate', 'detect'),
+        'think': ('think', 'ponder', 'consider', 'reflect'),
+        'know': ('know', 'understand', 'grasp', 'comprehend'),
+        'want': ('want', 'desire', 'wish', 'need'),
+        'help': ('help', 'assist', 'aid', 'support'),
+        'work': ('work', 'function', 'operate', 'perform'),
+        'use': ('use', 'employ', 'utilize', 'apply'),
+        'give': ('give', 'provide', 'offer', 'supply'),
+    }
+    
+    # Base word -> ((synonym, Capitalized synonym), ...) so encoding picks a
+    # ready-made variant instead of calling capitalize() per word
+    _SYNONYM_VARIANTS = {
+        base: tuple((s, s.capitalize()) for s in syns)
+        for base, syns in SYNONYM_GROUPS.items()
+    }
+    
+    # Reverse lookup: lowercase synonym -> (base word, index within its group)
+    _SYNONYM_LOOKUP = {
+        s.lower(): (base, i)
+        for base, syns in SYNONYM_GROUPS.items()
+        for i, s in enumerate(syns)
     }
     
+    # Lowercase synonym -> index within its group, all extraction needs
+    _SYNONYM_INDEX = {word: index for word, (_, index) in _SYNONYM_LOOKUP.items()}
+    
     # Default cover text - optimized for 2-bit encoding
     # Uses words from SYNONYM_GROUPS for maximum efficiency
     DEFAULT_COVER_TEXT = """
@@ -52,28 +81,13 @@ class LinguisticSteganographyService:
     """
     
     @staticmethod
-    def _message_to_binary(message: str) -> str:
-        """Convert message to binary string with compression"""
-        # Encode as base64 for ASCII-safe encoding
-        b64_message = base64.b64encode(message.encode('utf-8')).decode('ascii')
-        
-        # Convert to binary
-        binary = ''.join(format(ord(char), '08b') for char in b64_message)
-        return binary
+    def _encode_message(message: str) -> bytes:
+        """Encode message as base64 bytes for ASCII-safe embedding"""
+        return base64.b64encode(message.encode('utf-8'))
     
     @staticmethod
-    def _binary_to_message(binary: str) -> str:
-        """Convert binary string back to message"""
-        # Split binary into 8-bit chunks
-        chars = []
-        for i in range(0, len(binary), 8):
-            byte = binary[i:i+8]
-            if len(byte) == 8:
-                chars.append(chr(int(byte, 2)))
-        
-        b64_message = ''.join(chars)
-        
-        # Decode from base64
+    def _decode_message(b64_message: bytes) -> str:
+        """Decode base64 bytes back to message"""
         try:
             message = base64.b64decode(b64_message).decode('utf-8')
             return message
@@ -81,41 +95,56 @@ class LinguisticSteganographyService:
             raise ValueError(f"Failed to decode message: {str(e)}")
     
     @staticmethod
-    def _find_substitutable_words(text: str) -> List[Tuple[int, str, str]]:
+    def _bytes_to_synonym_indices(payload: bytes) -> List[int]:
+        """Split each byte into four 2-bit synonym indices in one vectorized pass"""
+        data = np.frombuffer(payload, dtype=np.uint8)
+        return ((data[:, None] >> _INDEX_SHIFTS) & 3).ravel().tolist()
+    
+    @staticmethod
+    def _synonym_indices_to_bytes(indices: bytearray) -> bytes:
+        """Pack 2-bit synonym indices four to a byte, dropping any trailing partial byte"""
+        byte_count = len(indices) // 4
+        grouped = np.frombuffer(indices, dtype=np.uint8, count=byte_count * 4).reshape(byte_count, 4)
+        return np.bitwise_or.reduce(grouped << _INDEX_SHIFTS, axis=1).astype(np.uint8).tobytes()
+    
+    @staticmethod
+    def _find_substitutable_words(text: str) -> Tuple[List[str], List[Tuple[int, str, str]]]:
         """
         Find all words in text that can be substituted with synonyms
-        Returns list of (position, word, base_word) tuples
+        Returns (words, substitutable) where words is the split text and
+        substitutable is a list of (position, word, base_word) tuples
         """
         words = text.split()
         substitutable = []
         
         for i, word in enumerate(words):
             # Clean word (remove punctuation)
-            clean_word = re.sub(r'[^\w]', '', word).lower()
+            clean_word = word.translate(_PUNCT_TABLE).lower()
             
             # Check if word matches any synonym group
-            for base_word, synonyms in LinguisticSteganographyService.SYNONYM_GROUPS.items():
-                if clean_word in [s.lower() for s in synonyms]:
-                    substitutable.append((i, word, base_word))
-                    break
+            hit = LinguisticSteganographyService._SYNONYM_LOOKUP.get(clean_word)
+            if hit:
+                substitutable.append((i, word, hit[0]))
         
-        return substitutable
+        return words, substitutable
     
     @staticmethod
-    def _prepare_cover_text(text: str, required_capacity: int) -> str:
+    def _prepare_cover_text(text: str, required_capacity: int) -> Tuple[List[str], List[Tuple[int, str, str]], int]:
         """
-        Prepare cover text with enough substitutable words
-        Repeats text if necessary, falls back to default if insufficient
+        Prepare cover words with enough substitutable words
+        Repeats the tokens if necessary, falls back to default if insufficient
+        Returns (words, substitutable, cover_text_length) where cover_text_length
+        is the length of the equivalent space-joined repeated text
         """
         # Find base capacity
-        substitutable = LinguisticSteganographyService._find_substitutable_words(text)
+        words, substitutable = LinguisticSteganographyService._find_substitutable_words(text)
         base_capacity = len(substitutable)
         
         if base_capacity == 0:
             # Fallback to default cover text if provided text has no substitutable words
-            print(f"⚠ Warning: Provided cover text has no substitutable words, using default")
+            logger.warning("Provided cover text has no substitutable words, using default")
             text = LinguisticSteganographyService.DEFAULT_COVER_TEXT
-            substitutable = LinguisticSteganographyService._find_substitutable_words(text)
+            words, substitutable = LinguisticSteganographyService._find_substitutable_words(text)
             base_capacity = len(substitutable)
             
             if base_capacity == 0:
@@ -124,13 +153,18 @@ class LinguisticSteganographyService:
         # Calculate how many repetitions we need
         repetitions = max(1, (required_capacity + base_capacity - 1) // base_capacity)
         
-        # Create repeated text
-        if repetitions > 1:
-            final_text = (text + " ") * repetitions
-        else:
-            final_text = text
+        # Repeat the token list rather than the text, offsetting the positions
+        # of each copy's substitutable words
+        word_count = len(words)
+        final_words = words * repetitions
+        final_substitutable = [
+            (position + copy * word_count, word, base_word)
+            for copy in range(repetitions)
+            for position, word, base_word in substitutable
+        ]
+        cover_text_length = (repetitions - 1) * (len(text) + 1) + len(text.strip())
         
-        return final_text.strip()
+        return final_words, final_substitutable, cover_text_length
     
     @staticmethod
     def hide_message(secret_message: str, cover_text: str = None) -> Tuple[Dict, int]:
@@ -146,110 +180,86 @@ class LinguisticSteganographyService:
             Tuple of (result dict, status code)
         """
         try:
-            print(f"\n[LINGUISTIC STEGO] Hiding message...")
-            print(f"Secret message length: {len(secret_message)} chars")
+            logger.debug("[LINGUISTIC STEGO] Hiding message (%d chars)", len(secret_message))
             
             # Use default cover text if none provided
             if not cover_text or not cover_text.strip():
-                print(f"Using default cover text")
+                logger.debug("Using default cover text")
                 cover_text = LinguisticSteganographyService.DEFAULT_COVER_TEXT
             else:
-                print(f"Using custom cover text (length: {len(cover_text)} chars)")
-            
-            # Convert message to binary
-            binary_message = LinguisticSteganographyService._message_to_binary(secret_message)
-            print(f"Binary message length: {len(binary_message)} bits")
+                logger.debug("Using custom cover text (length: %d chars)", len(cover_text))
             
-            # Add length header (32 bits)
-            message_length = len(binary_message)
-            length_binary = format(message_length, '032b')
-            full_binary = length_binary + binary_message
+            # Encode message as base64 bytes
+            b64_message = LinguisticSteganographyService._encode_message(secret_message)
+            binary_length = 8 * len(b64_message)
+            logger.debug("Binary message length: %d bits", binary_length)
             
-            # Pad to multiple of 2 bits (for 2-bit encoding)
-            if len(full_binary) % 2 != 0:
-                full_binary += '0'
+            # Prefix the 32-bit length header (message length in bits)
+            payload = binary_length.to_bytes(4, 'big') + b64_message
+            logger.debug("Total bits to embed (with header): %d", 8 * len(payload))
             
-            print(f"Total bits to embed (with header): {len(full_binary)}")
+            # Each byte yields four 2-bit synonym indices (00=0, 01=1, 10=2, 11=3),
+            # one per substituted word
+            synonym_indices = LinguisticSteganographyService._bytes_to_synonym_indices(payload)
+            required_words = len(synonym_indices)
             
-            # Calculate required words (2 bits per word)
-            required_words = (len(full_binary) + 1) // 2
-            
-            # Prepare cover text with enough capacity
-            prepared_cover = LinguisticSteganographyService._prepare_cover_text(
+            # Prepare cover words with enough capacity
+            words, substitutable_words, cover_text_length = LinguisticSteganographyService._prepare_cover_text(
                 cover_text, required_words
             )
             
-            # Find all substitutable words
-            substitutable_words = LinguisticSteganographyService._find_substitutable_words(prepared_cover)
-            
             if len(substitutable_words) < required_words:
                 return {
                     'success': False,
                     'error': f'Cover text has insufficient capacity: need {required_words} words, found {len(substitutable_words)}'
                 }, 400
             
-            print(f"Found {len(substitutable_words)} substitutable words in cover text")
-            print(f"Encoding 2 bits per word - need {required_words} words")
-            
-            # Create stego text by substituting synonyms
-            words = prepared_cover.split()
-            bit_index = 0
-            words_used = 0
+            logger.debug(
+                "Found %d substitutable words in cover text, need %d at 2 bits per word",
+                len(substitutable_words), required_words
+            )
             
-            for position, original_word, base_word in substitutable_words:
-                if bit_index >= len(full_binary):
-                    break
-                
-                # Get 2 bits to encode
-                two_bits = full_binary[bit_index:bit_index+2]
-                if len(two_bits) < 2:
-                    two_bits += '0'  # Pad if needed
-                
-                # Convert 2 bits to index (00=0, 01=1, 10=2, 11=3)
-                synonym_index = int(two_bits, 2)
-                
-                # Get synonym group
-                synonym_group = LinguisticSteganographyService.SYNONYM_GROUPS[base_word]
-                selected_synonym = synonym_group[synonym_index]
-                
+            # Create stego text by substituting synonyms in the already-split words;
+            # zip stops once every index is placed, and capacity was checked above
+            for (position, original_word, base_word), synonym_index in zip(substitutable_words, synonym_indices):
                 # Preserve original capitalization and punctuation
-                original_clean = re.sub(r'[^\w]', '', original_word)
+                original_clean = original_word.translate(_PUNCT_TABLE)
                 punctuation = original_word[len(original_clean):] if len(original_word) > len(original_clean) else ''
                 
-                # Apply capitalization
-                if original_clean and original_clean[0].isupper():
-                    selected_synonym = selected_synonym.capitalize()
+                # Pick the synonym, capitalized if the original word was
+                is_capitalized = bool(original_clean) and original_clean[0].isupper()
+                selected_synonym = LinguisticSteganographyService._SYNONYM_VARIANTS[base_word][synonym_index][is_capitalized]
                 
                 # Replace word
                 words[position] = selected_synonym + punctuation
-                
-                bit_index += 2
-                words_used += 1
+            
+            words_used = len(synonym_indices)
+            bit_index = 2 * words_used
             
             # Join words back
             stego_text = ' '.join(words)
             
-            print(f"[LINGUISTIC STEGO] Generated stego text")
-            print(f"Stego text length: {len(stego_text)} chars")
-            print(f"Embedded {bit_index} bits in {words_used} words")
-            print(f"Compression ratio: {len(stego_text) / len(secret_message):.2f}x")
+            compression_ratio = round(len(stego_text) / len(secret_message), 2) if len(secret_message) > 0 else 0
+            logger.debug(
+                "[LINGUISTIC STEGO] Generated stego text: %d chars, %d bits in %d words, ratio %.2fx",
+                len(stego_text), bit_index, words_used, compression_ratio
+            )
             
             return {
                 'success': True,
                 'stego_text': stego_text,
                 'message_length': len(secret_message),
-                'binary_length': len(binary_message),
+                'binary_length': binary_length,
                 'total_bits_embedded': bit_index,
-                'cover_text_length': len(prepared_cover),
+                'cover_text_length': cover_text_length,
                 'stego_text_length': len(stego_text),
                 'words_used': words_used,
                 'method': 'linguistic-2bit-encoding',
-                'compression_ratio': round(len(stego_text) / len(secret_message), 2) if len(secret_message) > 0 else 0
+                'compression_ratio': compression_ratio
             }, 200
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Linguistic steganography encoding failed")
             return {
                 'success': False,
                 'error': f'Linguistic steganography encoding failed: {str(e)}'
@@ -268,67 +278,62 @@ class LinguisticSteganographyService:
             Tuple of (result dict, status code)
         """
         try:
-            print(f"\n[LINGUISTIC STEGO] Extracting message...")
-            print(f"Stego text length: {len(stego_text)} chars")
+            logger.debug("[LINGUISTIC STEGO] Extracting message (stego text: %d chars)", len(stego_text))
             
-            # Find all words that match our synonym groups
+            # Find all words that match our synonym groups, collecting the 2-bit
+            # index each one encodes (0=00, 1=01, 2=10, 3=11)
             words = stego_text.split()
-            binary_bits = []
+            synonym_indices = bytearray(len(words))
+            words_decoded = 0
             
             for word in words:
                 # Clean word (remove punctuation)
-                clean_word = re.sub(r'[^\w]', '', word).lower()
+                clean_word = word.translate(_PUNCT_TABLE).lower()
                 
                 # Check if word is in any synonym group
-                for base_word, synonym_group in LinguisticSteganographyService.SYNONYM_GROUPS.items():
-                    if clean_word in [s.lower() for s in synonym_group]:
-                        # Find index of synonym (0-3)
-                        synonym_index = next((i for i, s in enumerate(synonym_group) if s.lower() == clean_word), 0)
-                        
-                        # Convert index to 2 bits (0=00, 1=01, 2=10, 3=11)
-                        two_bits = format(synonym_index, '02b')
-                        binary_bits.append(two_bits)
-                        break
+                synonym_index = LinguisticSteganographyService._SYNONYM_INDEX.get(clean_word)
+                if synonym_index is not None:
+                    synonym_indices[words_decoded] = synonym_index
+                    words_decoded += 1
             
-            binary_string = ''.join(binary_bits)
-            print(f"Extracted {len(binary_string)} bits from {len(binary_bits)} words")
+            bits_found = 2 * words_decoded
+            del synonym_indices[words_decoded:]
+            logger.debug("Extracted %d bits from %d words", bits_found, words_decoded)
             
-            if len(binary_string) < 32:
+            if bits_found < 32:
                 return {
                     'success': False,
-                    'error': f'Insufficient data extracted: only {len(binary_string)} bits (need at least 32 for header)'
+                    'error': f'Insufficient data extracted: only {bits_found} bits (need at least 32 for header)'
                 }, 400
             
-            # Extract length header (first 32 bits)
-            length_binary = binary_string[:32]
-            message_length = int(length_binary, 2)
+            # Reassemble bytes and extract length header (first 32 bits)
+            payload = LinguisticSteganographyService._synonym_indices_to_bytes(synonym_indices)
+            message_length = int.from_bytes(payload[:4], 'big')
             
-            print(f"Message length from header: {message_length} bits")
+            logger.debug("Message length from header: %d bits", message_length)
             
             # Validate message length
-            if message_length <= 0 or message_length > len(binary_string) - 32:
+            if message_length <= 0 or message_length > bits_found - 32:
                 return {
                     'success': False,
-                    'error': f'Invalid message length in header: {message_length} bits (have {len(binary_string) - 32} bits available)'
+                    'error': f'Invalid message length in header: {message_length} bits (have {bits_found - 32} bits available)'
                 }, 400
             
-            # Extract actual message bits
-            message_binary = binary_string[32:32 + message_length]
-            
-            print(f"Extracting {message_length} bits for message")
+            # Extract actual message bytes (whole bytes only)
+            b64_message = payload[4:4 + message_length // 8]
             
-            # Decode binary to message
+            # Decode base64 bytes to message
             try:
-                extracted_message = LinguisticSteganographyService._binary_to_message(message_binary)
-                print(f"[LINGUISTIC STEGO] Successfully extracted message: {len(extracted_message)} chars")
+                extracted_message = LinguisticSteganographyService._decode_message(b64_message)
+                logger.debug("[LINGUISTIC STEGO] Successfully extracted message: %d chars", len(extracted_message))
                 
                 return {
                     'success': True,
                     'extracted_message': extracted_message,
                     'message_length': len(extracted_message),
-                    'bits_extracted': len(message_binary),
-                    'total_bits_found': len(binary_string),
-                    'words_decoded': len(binary_bits),
+                    'bits_extracted': message_length,
+                    'total_bits_found': bits_found,
+                    'words_decoded': words_decoded,
                     'method': 'linguistic-2bit-encoding'
                 }, 200
                 
@@ -339,8 +344,7 @@ class LinguisticSteganographyService:
                 }, 400
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Linguistic steganography extraction failed")
             return {
                 'success': False,
                 'error': f'Linguistic steganography extraction failed: {str(e)}'
@@ -1,10 +1,28 @@
-import random
+import secrets
 import math
 import base64
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPublicKey
-from .utils import create_error_response, create_success_response
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
+from .utils import (
+    create_error_response, create_success_response, load_private_key_pem, load_public_key_pem,
+    verify_signature_batch
+)
+
+# Read size when hashing a file-like message for signing
+SIGN_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Fixed Miller-Rabin witnesses: the primes up to 41 are deterministic for
+# n < 3.3e24 (up to 37 only reaches 3.18e23), and a strong probable-prime
+# test beyond that
+MILLER_RABIN_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# Odd primes below 1000 for trial division of prime candidates
+SMALL_PRIMES = tuple(p for p in range(3, 1000) if all(p % q for q in range(2, int(p ** 0.5) + 1)))
+
+# A candidate shares no factor with SMALL_PRIMES iff gcd(candidate, product) == 1
+SMALL_PRIME_PRODUCT = math.prod(SMALL_PRIMES)
 
 class RSAService:
     """RSA implementation for text encryption/decryption using cryptography library"""
@@ -82,8 +100,8 @@ class RSAService:
             if not plaintext:
                 return create_error_response("Plaintext cannot be empty")
             
-            # Load public key
-            public_key = serialization.load_pem_public_key(public_key_pem.encode('utf-8'))
+            # Load public key (parsed once per distinct PEM)
+            public_key = load_public_key_pem(public_key_pem)
             
             # Check text length vs key size
             key_size = public_key.key_size
@@ -135,11 +153,8 @@ class RSAService:
             if not ciphertext_b64:
                 return create_error_response("Ciphertext cannot be empty")
             
-            # Load private key
-            private_key = serialization.load_pem_private_key(
-                private_key_pem.encode('utf-8'),
-                password=None
-            )
+            # Load private key (parsed once per distinct PEM)
+            private_key = load_private_key_pem(private_key_pem)
             
             # Decode base64 ciphertext
             try:
@@ -172,12 +187,13 @@ class RSAService:
             return create_error_response(f"Decryption failed: {str(e)}")
     
     @staticmethod
-    def sign(message: str, private_key_pem: str):
+    def sign(message, private_key_pem: str):
         """
         Sign a message using RSA private key
         
         Args:
-            message: Message to sign
+            message: Message to sign (str, bytes to skip UTF-8 encoding, or a binary
+                file-like object, which is hashed in chunks and never held in memory)
             private_key_pem: PEM formatted private key
         
         Returns:
@@ -187,20 +203,31 @@ class RSAService:
             if not message:
                 return create_error_response("Message cannot be empty")
             
-            # Load private key
-            private_key = serialization.load_pem_private_key(
-                private_key_pem.encode('utf-8'),
-                password=None
-            )
+            # Load private key (parsed once per distinct PEM)
+            private_key = load_private_key_pem(private_key_pem)
+            
+            if hasattr(message, 'read'):
+                # Stream the SHA-256 and sign the digest
+                digest = hashes.Hash(hashes.SHA256())
+                message_length = 0
+                for chunk in iter(lambda: message.read(SIGN_STREAM_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    message_length += len(chunk)
+                data_to_sign = digest.finalize()
+                hash_algorithm = Prehashed(hashes.SHA256())
+            else:
+                data_to_sign = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+                message_length = len(message)
+                hash_algorithm = hashes.SHA256()
             
             # Sign the message
             signature = private_key.sign(
-                message.encode('utf-8'),
+                data_to_sign,
                 padding.PSS(
                     mgf=padding.MGF1(hashes.SHA256()),
                     salt_length=padding.PSS.MAX_LENGTH
                 ),
-                hashes.SHA256()
+                hash_algorithm
             )
             
             # Encode signature as base64
@@ -209,7 +236,7 @@ class RSAService:
             result = create_success_response({
                 "message": "Message signed successfully",
                 "signature": signature_b64,
-                "message_length": len(message),
+                "message_length": message_length,
                 "signature_algorithm": "RSA-PSS with SHA-256",
                 "hash_algorithm": "SHA-256"
             })
@@ -236,8 +263,8 @@ class RSAService:
             if not message or not signature_b64:
                 return create_error_response("Message and signature cannot be empty")
             
-            # Load public key
-            public_key = serialization.load_pem_public_key(public_key_pem.encode('utf-8'))
+            # Load public key (parsed once per distinct PEM)
+            public_key = load_public_key_pem(public_key_pem)
             
             # Decode signature
             try:
@@ -246,19 +273,7 @@ class RSAService:
                 return create_error_response("Invalid base64 signature format")
             
             # Verify signature
-            try:
-                public_key.verify(
-                    signature,
-                    message.encode('utf-8'),
-                    padding.PSS(
-                        mgf=padding.MGF1(hashes.SHA256()),
-                        salt_length=padding.PSS.MAX_LENGTH
-                    ),
-                    hashes.SHA256()
-                )
-                is_valid = True
-            except Exception:
-                is_valid = False
+            is_valid = RSAService._verify_with_key(public_key, message, signature)
             
             result = create_success_response({
                 "message": "Signature verification completed",
@@ -272,10 +287,41 @@ class RSAService:
         except Exception as e:
             return create_error_response(f"Verification failed: {str(e)}")
     
+    @staticmethod
+    def _verify_with_key(public_key, message, signature: bytes) -> bool:
+        """Check one RSA-PSS signature against an already-loaded public key (message str or bytes)"""
+        try:
+            message_bytes = message if isinstance(message, (bytes, bytearray)) else message.encode('utf-8')
+            public_key.verify(
+                signature,
+                message_bytes,
+                padding.PSS(
+                    mgf=padding.MGF1(hashes.SHA256()),
+                    salt_length=padding.PSS.MAX_LENGTH
+                ),
+                hashes.SHA256()
+            )
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def verify_batch(items: list):
+        """
+        Verify many RSA signatures in one call
+        
+        Args:
+            items: List of dicts with message, signature (base64) and public_key (PEM)
+        
+        Returns:
+            Tuple of (result_dict, status_code)
+        """
+        return verify_signature_batch(items, RSAService._verify_with_key, {"signature_algorithm": "RSA-PSS with SHA-256"})
+    
     # Keep the old methods for backward compatibility with educational demos
     @staticmethod
-    def is_prime(n, k=5):
-        """Miller-Rabin primality test - much faster than trial division"""
+    def is_prime(n):
+        """Miller-Rabin primality test with fixed witnesses - much faster than trial division"""
         if n < 2:
             return False
         if n == 2 or n == 3:
@@ -291,8 +337,9 @@ class RSAService:
             d //= 2
         
         # Witness loop
-        for _ in range(k):
-            a = random.randrange(2, n - 1)
+        for a in MILLER_RABIN_WITNESSES:
+            if a >= n - 1:
+                continue
             x = pow(a, d, n)
             
             if x == 1 or x == n - 1:
@@ -310,18 +357,8 @@ class RSAService:
     @staticmethod
     def generate_prime(bits):
         """Generate a random prime number with specified bits using Miller-Rabin test"""
-        while True:
-            # Generate random odd number with specified bits
-            num = random.getrandbits(bits)
-            # Ensure it's in the right range and odd
-            num |= (1 << bits - 1) | 1
-            
-            # Quick check for small factors
-            if num % 3 == 0 or num % 5 == 0 or num % 7 == 0 or num % 11 == 0:
-                continue
-                
-            if RSAService.is_prime(num):
-                return num
+        generator = _PRIME_GENERATORS.get(bits) or _make_prime_generator(bits)
+        return generator()
     
     @staticmethod
     def gcd(a, b):
@@ -332,16 +369,37 @@ class RSAService:
     
     @staticmethod
     def mod_inverse(e, phi):
-        """Find modular multiplicative inverse using Extended Euclidean Algorithm"""
-        def extended_gcd(a, b):
-            if a == 0:
-                return b, 0, 1
-            gcd, x1, y1 = extended_gcd(b % a, a)
-            x = y1 - (b // a) * x1
-            y = x1
-            return gcd, x, y
+        """Find modular multiplicative inverse using the iterative Extended Euclidean Algorithm"""
+        t, new_t = 0, 1
+        r, new_r = phi, e
+        while new_r:
+            q = r // new_r
+            t, new_t = new_t, t - q * new_t
+            r, new_r = new_r, r - q * new_r
         
-        gcd, x, _ = extended_gcd(e, phi)
-        if gcd != 1:
+        if r != 1:
             raise ValueError("Modular inverse does not exist")
-        return (x % phi + phi) % phi
+        return t % phi
+
+
+def _make_prime_generator(bits):
+    """Build a prime generator for a fixed bit size, with its candidate mask precomputed"""
+    # Top bit keeps the candidate in range, bottom bit makes it odd
+    mask = (1 << bits - 1) | 1
+    small_prime_bound = SMALL_PRIMES[-1]
+    
+    def generate():
+        while True:
+            num = secrets.randbits(bits) | mask
+            
+            # Quick check for small factors (much cheaper than a Miller-Rabin round)
+            if num > small_prime_bound and math.gcd(num, SMALL_PRIME_PRODUCT) != 1:
+                continue
+            
+            if RSAService.is_prime(num):
+                return num
+    
+    return generate
+
+# Generators for the prime sizes behind the supported RSA key sizes
+_PRIME_GENERATORS = {bits: _make_prime_generator(bits) for bits in (512, 1024, 1536, 2048)}
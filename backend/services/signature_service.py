@@ -2,6 +2,14 @@ from .rsa_service import RSAService
 from .ecc_service import ECCService
 from .utils import create_error_response, create_success_response
 
+# Signature backends by algorithm name, with the keygen parameter each one takes
+_SIGNERS = {'RSA': RSAService, 'ECC': ECCService}
+_KEYGEN_PARAMS = {'RSA': ('key_size', 2048), 'ECC': ('curve', 'secp256r1')}
+
+# Keypairs reused by sign_and_verify, keyed by (algorithm, key_size or curve);
+# values are (keypair_result, status_code, ecc_key or None)
+_demo_keypairs = {}
+
 class SignatureService:
     """Service for digital signature operations using RSA or ECC"""
     
@@ -23,21 +31,14 @@ class SignatureService:
                 return create_error_response("Message and private key are required")
             
             algorithm = algorithm.upper()
-            
-            if algorithm == 'RSA':
-                result, status_code = RSAService.sign(message, private_key_pem)
-                if status_code == 200:
-                    result['algorithm'] = 'RSA'
-                return result, status_code
-            
-            elif algorithm == 'ECC':
-                result, status_code = ECCService.sign(message, private_key_pem)
-                if status_code == 200:
-                    result['algorithm'] = 'ECC'
-                return result, status_code
-            
-            else:
+            service = _SIGNERS.get(algorithm)
+            if service is None:
                 return create_error_response("Algorithm must be 'RSA' or 'ECC'")
+            
+            result, status_code = service.sign(message, private_key_pem)
+            if status_code == 200:
+                result['algorithm'] = algorithm
+            return result, status_code
         
         except Exception as e:
             return create_error_response(f"Signing failed: {str(e)}")
@@ -61,24 +62,46 @@ class SignatureService:
                 return create_error_response("Message, signature, and public key are required")
             
             algorithm = algorithm.upper()
+            service = _SIGNERS.get(algorithm)
+            if service is None:
+                return create_error_response("Algorithm must be 'RSA' or 'ECC'")
             
-            if algorithm == 'RSA':
-                result, status_code = RSAService.verify(message, signature, public_key_pem)
-                if status_code == 200:
-                    result['algorithm'] = 'RSA'
-                return result, status_code
-            
-            elif algorithm == 'ECC':
-                result, status_code = ECCService.verify(message, signature, public_key_pem)
-                if status_code == 200:
-                    result['algorithm'] = 'ECC'
-                return result, status_code
+            result, status_code = service.verify(message, signature, public_key_pem)
+            if status_code == 200:
+                result['algorithm'] = algorithm
+            return result, status_code
+        
+        except Exception as e:
+            return create_error_response(f"Verification failed: {str(e)}")
+    
+    @staticmethod
+    def verify_batch(items: list, algorithm: str = 'RSA'):
+        """
+        Verify many signatures made with the same algorithm in one call
+        
+        Args:
+            items: List of dicts with message, signature (base64) and public_key (PEM)
+            algorithm: Signing algorithm ('RSA' or 'ECC')
+        
+        Returns:
+            Tuple of (result_dict, status_code)
+        """
+        try:
+            if not isinstance(items, list) or not items:
+                return create_error_response("Items must be a non-empty list")
             
-            else:
+            algorithm = algorithm.upper()
+            service = _SIGNERS.get(algorithm)
+            if service is None:
                 return create_error_response("Algorithm must be 'RSA' or 'ECC'")
+            
+            result, status_code = service.verify_batch(items)
+            if status_code == 200:
+                result['algorithm'] = algorithm
+            return result, status_code
         
         except Exception as e:
-            return create_error_response(f"Verification failed: {str(e)}")
+            return create_error_response(f"Batch verification failed: {str(e)}")
     
     @staticmethod
     def generate_keypair(algorithm: str = 'RSA', **kwargs):
@@ -94,35 +117,44 @@ class SignatureService:
         """
         try:
             algorithm = algorithm.upper()
-            
-            if algorithm == 'RSA':
-                key_size = kwargs.get('key_size', 2048)
-                result, status_code = RSAService.generate_keypair(key_size)
-                if status_code == 200:
-                    result['algorithm'] = 'RSA'
-                return result, status_code
-            
-            elif algorithm == 'ECC':
-                curve = kwargs.get('curve', 'secp256r1')
-                result, status_code = ECCService.generate_keypair(curve)
-                if status_code == 200:
-                    result['algorithm'] = 'ECC'
-                return result, status_code
-            
-            else:
+            service = _SIGNERS.get(algorithm)
+            if service is None:
                 return create_error_response("Algorithm must be 'RSA' or 'ECC'")
+            
+            param_name, param_default = _KEYGEN_PARAMS[algorithm]
+            result, status_code = service.generate_keypair(kwargs.get(param_name, param_default))
+            if status_code == 200:
+                result['algorithm'] = algorithm
+            return result, status_code
         
         except Exception as e:
             return create_error_response(f"Key generation failed: {str(e)}")
     
     @staticmethod
-    def sign_and_verify(message: str, algorithm: str = 'RSA', **kwargs):
+    def rotate_demo_keys():
+        """
+        Drop the keypairs cached for sign_and_verify so the next call generates fresh ones
+        
+        Returns:
+            Tuple of (result_dict, status_code)
+        """
+        rotated = len(_demo_keypairs)
+        _demo_keypairs.clear()
+        return create_success_response({
+            "message": "Demo keypairs rotated",
+            "keypairs_rotated": rotated
+        })
+    
+    @staticmethod
+    def sign_and_verify(message: str, algorithm: str = 'RSA', use_cached_key: bool = True, **kwargs):
         """
         Complete workflow: generate keys, sign message, and verify signature
         
         Args:
             message: Message to sign and verify
             algorithm: Algorithm type ('RSA' or 'ECC')
+            use_cached_key: Reuse the keypair from an earlier call with the same
+                algorithm and key size/curve instead of generating one (see rotate_demo_keys)
             **kwargs: Additional parameters for key generation
         
         Returns:
@@ -132,16 +164,38 @@ class SignatureService:
             if not message:
                 return create_error_response("Message is required")
             
-            # Generate key pair
-            keypair_result, status_code = SignatureService.generate_keypair(algorithm, **kwargs)
-            if status_code != 200:
-                return keypair_result, status_code
+            algorithm = algorithm.upper()
+            if algorithm not in _SIGNERS:
+                return create_error_response("Algorithm must be 'RSA' or 'ECC'")
+            
+            # Generate key pair, or reuse the cached one (ECC keeps the live key
+            # object so signing does not have to parse the PEM it was just given)
+            is_ecc = algorithm == 'ECC'
+            param_name, param_default = _KEYGEN_PARAMS[algorithm]
+            cache_key = (algorithm, kwargs.get(param_name, param_default))
+            cached = _demo_keypairs.get(cache_key) if use_cached_key else None
+            
+            if cached is not None:
+                keypair_result, status_code, ecc_key = cached
+            else:
+                ecc_key = None
+                if is_ecc:
+                    keypair_result, status_code, ecc_key = ECCService.generate_keypair_raw(cache_key[1])
+                else:
+                    keypair_result, status_code = SignatureService.generate_keypair(algorithm, **kwargs)
+                if status_code != 200:
+                    return keypair_result, status_code
+                if use_cached_key:
+                    _demo_keypairs[cache_key] = (keypair_result, status_code, ecc_key)
             
             private_key = keypair_result['private_key']
             public_key = keypair_result['public_key']
             
             # Sign message
-            sign_result, status_code = SignatureService.sign_message(message, private_key, algorithm)
+            if ecc_key is not None:
+                sign_result, status_code = ECCService.sign_with_key(ecc_key, message)
+            else:
+                sign_result, status_code = SignatureService.sign_message(message, private_key, algorithm)
             if status_code != 200:
                 return sign_result, status_code
             
@@ -1,41 +1,65 @@
-from PIL import Image
-import numpy as np
 import io
+from typing import TYPE_CHECKING
 from .utils import (
     create_error_response, create_success_response, 
-    text_to_binary, binary_to_text, 
     image_to_bytes, file_to_image, save_temp_image
 )
 
+if TYPE_CHECKING:
+    import numpy as np
+
+# End-of-message marker and the number of LSBs it occupies
+DELIMITER = b'###END###'
+DELIMITER_BIT_COUNT = len(DELIMITER) * 8
+
+# Carrier channel modes: every RGB value, or the blue plane only
+# (one third of the capacity and memory traffic, red/green untouched)
+CHANNEL_COUNTS = {'RGB': 3, 'B': 1}
+
+# Image rows per tile when accumulating compare_images statistics
+COMPARE_TILE_ROWS = 64
+
+# zlib level for encoded PNGs: LSB noise barely compresses, so favour speed
+PNG_COMPRESS_LEVEL = 1
+
+# LSBs scanned per extraction chunk; a multiple of 8 keeps chunks byte-aligned
+EXTRACT_CHUNK_BITS = 1 << 16
+
 class SteganographyService:
     """Service for LSB steganography operations"""
     
     @staticmethod
-    def _modify_lsb(pixel_value: int, bit: str) -> int:
-        """Modify the least significant bit of a pixel value"""
-        return (pixel_value & 0xFE) | int(bit)
-    
-    @staticmethod
-    def _extract_lsb(pixel_value: int) -> str:
-        """Extract the least significant bit of a pixel value"""
-        return str(pixel_value & 1)
+    def _lsb_carrier(pixels: 'np.ndarray', channels: str) -> 'np.ndarray':
+        """1-D view of the channel values whose LSBs carry the message (writes land in pixels)"""
+        if channels == 'B':
+            return pixels.reshape(-1, 3)[:, 2]
+        return pixels.ravel()
     
     @staticmethod
-    def embed_message(image_file, message: str):
+    def embed_message(image_file, message: str, return_image: bool = False, channels: str = 'RGB'):
         """
         Embed a secret message in an image using LSB steganography
         
         Args:
             image_file: Image file (FileStorage or PIL Image)
             message: Secret message to embed
+            return_image: Return the PIL Image instead of PNG bytes (for in-process pipelines)
+            channels: 'RGB' to use every channel value, 'B' for the blue plane only
         
         Returns:
             Tuple of (result_dict, status_code)
         """
+        # Imported here so importing the service (e.g. via app startup) stays cheap
+        from PIL import Image
+        import numpy as np
+        
         try:
             if not message:
                 return create_error_response("Message is required")
             
+            if channels not in CHANNEL_COUNTS:
+                return create_error_response("Channels must be 'RGB' or 'B'")
+            
             # Load image
             if hasattr(image_file, 'stream'):
                 image = file_to_image(image_file)
@@ -46,14 +70,14 @@ class SteganographyService:
             if image.mode != 'RGB':
                 image = image.convert('RGB')
             
-            # Convert message to binary with delimiter
-            message_binary = text_to_binary(message)
-            delimiter = text_to_binary("###END###")  # Delimiter to mark end of message
-            data_to_embed = message_binary + delimiter
+            # Convert message (UTF-8) plus delimiter to a 0/1 bit array in a
+            # single unpack, with no separate concatenate pass
+            data_to_embed = np.unpackbits(np.frombuffer(message.encode('utf-8') + DELIMITER, dtype=np.uint8))
             
             # Check if image can hold the message
             pixels = np.array(image)
-            total_pixels = pixels.size
+            flat_pixels = SteganographyService._lsb_carrier(pixels, channels)
+            total_pixels = flat_pixels.size
             
             if len(data_to_embed) > total_pixels:
                 return create_error_response(
@@ -61,25 +85,22 @@ class SteganographyService:
                     f"but message requires {len(data_to_embed)} bits"
                 )
             
-            # Flatten the image array for easier processing
-            flat_pixels = pixels.flatten()
-            
-            # Embed data
-            for i, bit in enumerate(data_to_embed):
-                flat_pixels[i] = SteganographyService._modify_lsb(flat_pixels[i], bit)
+            # Embed data: clear each LSB and OR in the bit, in place so the
+            # carrier prefix is updated without full-size temporaries
+            carrier = flat_pixels[:data_to_embed.size]
+            np.bitwise_and(carrier, np.uint8(0xFE), out=carrier)
+            np.bitwise_or(carrier, data_to_embed, out=carrier)
             
-            # Reshape back to original image dimensions
-            encoded_pixels = flat_pixels.reshape(pixels.shape)
-            encoded_image = Image.fromarray(encoded_pixels.astype('uint8'), 'RGB')
-            
-            # Convert to bytes
-            encoded_bytes = image_to_bytes(encoded_image, 'PNG')
+            # Decode straight from the (contiguous uint8) array's buffer, with no
+            # intermediate tobytes() copy or array-interface round trip
+            encoded_image = Image.frombytes('RGB', image.size, memoryview(pixels))
             
             return create_success_response({
-                "encoded_image": encoded_bytes,
+                "encoded_image": encoded_image if return_image else image_to_bytes(encoded_image, 'PNG', compress_level=PNG_COMPRESS_LEVEL),
                 "message_length": len(message),
                 "bits_used": len(data_to_embed),
                 "image_capacity": total_pixels,
+                "channels": channels,
                 "format": "PNG"
             })
         
@@ -87,17 +108,23 @@ class SteganographyService:
             return create_error_response(f"Message embedding failed: {str(e)}")
     
     @staticmethod
-    def extract_message(image_file):
+    def extract_message(image_file, channels: str = 'RGB'):
         """
         Extract a secret message from an image using LSB steganography
         
         Args:
             image_file: Image file containing hidden message (FileStorage or PIL Image)
+            channels: Carrier channels the message was embedded with ('RGB' or 'B')
         
         Returns:
             Tuple of (result_dict, status_code)
         """
+        import numpy as np
+        
         try:
+            if channels not in CHANNEL_COUNTS:
+                return create_error_response("Channels must be 'RGB' or 'B'")
+            
             # Load image
             if hasattr(image_file, 'stream'):
                 image = file_to_image(image_file)
@@ -109,32 +136,36 @@ class SteganographyService:
                 image = image.convert('RGB')
             
             # Get pixel data
-            pixels = np.array(image)
-            flat_pixels = pixels.flatten()
-            
-            # Extract LSBs
-            binary_data = ''
-            delimiter_binary = text_to_binary("###END###")
+            pixels = np.asarray(image)
+            flat_pixels = SteganographyService._lsb_carrier(pixels, channels)
             
-            for pixel_value in flat_pixels:
-                binary_data += SteganographyService._extract_lsb(pixel_value)
-                
-                # Check if we've found the delimiter
-                if binary_data.endswith(delimiter_binary):
-                    # Remove delimiter from the extracted data
-                    message_binary = binary_data[:-len(delimiter_binary)]
+            # Extract LSBs packed 8 to a byte, chunk by chunk, stopping as soon as
+            # the delimiter shows up; message and delimiter are both whole bytes
+            # from the first pixel, so the packed stream is aligned
+            packed = bytearray()
+            for start in range(0, flat_pixels.size, EXTRACT_CHUNK_BITS):
+                # Re-check the tail of the previous chunk for a delimiter split across chunks
+                search_from = max(0, len(packed) - len(DELIMITER) + 1)
+                packed += np.packbits(flat_pixels[start:start + EXTRACT_CHUNK_BITS] & np.uint8(1)).tobytes()
+                end = packed.find(DELIMITER, search_from)
+                if end != -1:
                     break
             else:
                 return create_error_response("No hidden message found or message incomplete")
             
-            # Convert binary to text
+            # Decode the message bytes as text
             try:
-                message = binary_to_text(message_binary)
+                message_bytes = bytes(packed[:end])
+                try:
+                    message = message_bytes.decode('utf-8')
+                except UnicodeDecodeError:
+                    # Images embedded before UTF-8 stored one byte per character
+                    message = message_bytes.decode('latin-1')
                 
                 return create_success_response({
                     "message": message,
                     "message_length": len(message),
-                    "bits_extracted": len(message_binary)
+                    "bits_extracted": end * 8
                 })
             
             except Exception:
@@ -144,31 +175,31 @@ class SteganographyService:
             return create_error_response(f"Message extraction failed: {str(e)}")
     
     @staticmethod
-    def get_image_capacity(image_file):
+    def get_image_capacity(image_file, channels: str = 'RGB'):
         """
         Get the maximum message capacity of an image
         
         Args:
             image_file: Image file (FileStorage or PIL Image)
+            channels: Carrier channels ('RGB' or 'B')
         
         Returns:
             Tuple of (result_dict, status_code)
         """
         try:
+            if channels not in CHANNEL_COUNTS:
+                return create_error_response("Channels must be 'RGB' or 'B'")
+            
             # Load image
             if hasattr(image_file, 'stream'):
                 image = file_to_image(image_file)
             else:
                 image = image_file
             
-            # Convert to RGB if not already
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Calculate capacity
-            pixels = np.array(image)
-            total_pixels = pixels.size
-            delimiter_bits = len(text_to_binary("###END###"))
+            # Calculate capacity from the header dimensions alone: embedding always
+            # works on the RGB conversion, using 3 or 1 channel values per pixel
+            total_pixels = image.width * image.height * CHANNEL_COUNTS[channels]
+            delimiter_bits = DELIMITER_BIT_COUNT
             max_message_bits = total_pixels - delimiter_bits
             max_message_chars = max_message_bits // 8  # 8 bits per character
             
@@ -195,6 +226,8 @@ class SteganographyService:
         Returns:
             Tuple of (result_dict, status_code)
         """
+        import numpy as np
+        
         try:
             # Load images
             if hasattr(original_file, 'stream'):
@@ -214,21 +247,34 @@ class SteganographyService:
                 encoded = encoded.convert('RGB')
             
             # Convert to numpy arrays
-            orig_pixels = np.array(original)
-            enc_pixels = np.array(encoded)
+            orig_pixels = np.asarray(original)
+            enc_pixels = np.asarray(encoded)
             
             # Calculate differences
             if orig_pixels.shape != enc_pixels.shape:
                 return create_error_response("Images must have the same dimensions")
             
-            # Calculate pixel differences
-            diff_pixels = np.abs(orig_pixels.astype(int) - enc_pixels.astype(int))
-            
-            # Statistics
             total_pixels = orig_pixels.size
-            changed_pixels = np.count_nonzero(diff_pixels)
-            max_difference = np.max(diff_pixels)
-            avg_difference = np.mean(diff_pixels)
+            
+            if np.array_equal(orig_pixels, enc_pixels):
+                # Identical images: skip the difference pass entirely
+                changed_pixels, max_difference, avg_difference = 0, 0, 0.0
+            else:
+                # Accumulate statistics over row tiles so the uint8 difference
+                # buffers stay cache-sized instead of spanning the whole image
+                changed_pixels, max_difference, diff_sum = 0, 0, 0
+                for y0 in range(0, orig_pixels.shape[0], COMPARE_TILE_ROWS):
+                    tile_orig = orig_pixels[y0:y0 + COMPARE_TILE_ROWS]
+                    tile_enc = enc_pixels[y0:y0 + COMPARE_TILE_ROWS]
+                    
+                    # Pixel differences, staying in uint8 (|a - b| == max - min)
+                    diff_tile = np.maximum(tile_orig, tile_enc) - np.minimum(tile_orig, tile_enc)
+                    
+                    changed_pixels += np.count_nonzero(diff_tile)
+                    max_difference = max(max_difference, int(diff_tile.max()))
+                    diff_sum += int(diff_tile.sum(dtype=np.uint64))
+                
+                avg_difference = diff_sum / total_pixels
             
             return create_success_response({
                 "total_pixels": int(total_pixels),
@@ -4,24 +4,38 @@ Hides secret messages within cover text using linguistic steganography
 Methods: Word spacing, synonym substitution, sentence generation
 """
 
+import bisect
+import functools
+import logging
 import random
 import re
+import numpy as np
 from typing import Dict, Any, Tuple, List
 
+from .utils import bytes_to_binary, text_to_binary, binary_to_text
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=2048)
+def _u16_bin(n: int) -> str:
+    """16-bit binary length header, cached since message lengths repeat"""
+    return format(n, '016b')
+
 
 class TextSteganographyService:
     """Service for hiding and extracting messages in text"""
     
     # Cover text templates for different message lengths
     COVER_TEMPLATES = {
-        'short': [
+        'short': (
             "The quick brown fox jumps over the lazy dog near the peaceful river.",
             "In a world of constant change, adaptability becomes our greatest strength.",
             "Technology continues to reshape how we communicate and share information.",
             "Every journey begins with a single step towards your destination.",
             "Nature provides endless inspiration for creativity and innovation daily."
-        ],
-        'medium': [
+        ),
+        'medium': (
             "The advancement of modern technology has revolutionized the way we communicate and interact with each other. "
             "Through the internet and mobile devices, people can now connect instantly across vast distances. "
             "This digital transformation has opened up new opportunities for collaboration and innovation. "
@@ -36,8 +50,8 @@ class TextSteganographyService:
             "From the smallest microorganisms to the largest ecosystems, life finds a way to thrive. "
             "Scientists continue to study these patterns to better understand our planet. "
             "This knowledge helps us make more informed decisions about our environment."
-        ],
-        'long': [
+        ),
+        'long': (
             "Cryptography has been an essential tool for secure communication throughout human history. "
             "Ancient civilizations used simple substitution ciphers to protect sensitive information from adversaries. "
             "The Caesar cipher, developed by Julius Caesar himself, shifted letters by a fixed number of positions. "
@@ -64,36 +78,55 @@ class TextSteganographyService:
             "Interactive multimedia content enhances engagement and understanding of complex subjects. "
             "However, the human element remains crucial for effective education and mentorship. "
             "Balancing technology with traditional methods creates the most effective learning environments."
-        ]
+        )
     }
     
+    # Message length bounds for the cover categories: < 50 short, < 200 medium, else long
+    _COVER_THRESHOLDS = (50, 200)
+    _COVER_CATEGORIES = ('short', 'medium', 'long')
+    
+    # Word splits of the built-in templates, measured once at class load so
+    # embedding into a default template skips str.split()
+    _TEMPLATE_WORDS = {
+        template: tuple(template.split())
+        for templates in COVER_TEMPLATES.values() for template in templates
+    }
+    
+    # Byte -> is-whitespace table matching str.split() for ASCII text
+    _ASCII_WHITESPACE = np.zeros(256, dtype=bool)
+    _ASCII_WHITESPACE[[ord(c) for c in ' \t\n\x0b\x0c\r\x1c\x1d\x1e\x1f']] = True
+    
     @staticmethod
     def text_to_binary(text: str) -> str:
         """Convert text to binary string"""
-        return ''.join(format(ord(char), '08b') for char in text)
+        return text_to_binary(text)
     
     @staticmethod
     def binary_to_text(binary: str) -> str:
         """Convert binary string to text"""
         try:
-            chars = []
-            for i in range(0, len(binary), 8):
-                byte = binary[i:i+8]
-                if len(byte) == 8:
-                    chars.append(chr(int(byte, 2)))
-            return ''.join(chars)
-        except:
+            return binary_to_text(binary)
+        except ValueError:
             return ""
     
+    @staticmethod
+    def _count_words(text: str) -> int:
+        """Count whitespace-separated words, as len(text.split()) but without building the list"""
+        if not text.isascii():
+            return len(text.split())
+        
+        # A word starts at every non-whitespace byte that follows whitespace (or the start)
+        is_space = TextSteganographyService._ASCII_WHITESPACE[np.frombuffer(text.encode('ascii'), dtype=np.uint8)]
+        if not is_space.size:
+            return 0
+        return int(not is_space[0]) + int(np.count_nonzero(is_space[:-1] & ~is_space[1:]))
+    
     @staticmethod
     def select_cover_text(message_length: int) -> str:
         """Select appropriate cover text based on message length"""
-        if message_length < 50:
-            category = 'short'
-        elif message_length < 200:
-            category = 'medium'
-        else:
-            category = 'long'
+        category = TextSteganographyService._COVER_CATEGORIES[
+            bisect.bisect_right(TextSteganographyService._COVER_THRESHOLDS, message_length)
+        ]
         
         return random.choice(TextSteganographyService.COVER_TEMPLATES[category])
     
@@ -103,42 +136,40 @@ class TextSteganographyService:
         Embed binary message using whitespace steganography
         Uses single space (0) and double space (1) between words
         """
-        # Convert message to binary
-        binary_message = TextSteganographyService.text_to_binary(secret_message)
+        # Convert message (always UTF-8, so extraction knows the encoding) to binary
+        binary_message = bytes_to_binary(secret_message.encode('utf-8'))
         
-        # Add delimiter and length prefix
-        message_length = len(secret_message)
-        header = format(message_length, '016b')  # 16-bit length
+        # Add length prefix (in UTF-8 bytes)
+        message_length = len(binary_message) // 8
+        header = _u16_bin(message_length)  # 16-bit length
         full_binary = header + binary_message
         
-        # Split cover text into words
-        words = cover_text.split()
+        # Split cover text into words (pre-split for the built-in templates)
+        words = TextSteganographyService._TEMPLATE_WORDS.get(cover_text) or cover_text.split()
         
         # Check if we have enough words
         if len(words) - 1 < len(full_binary):
             # Need more cover text, duplicate or extend
             multiplier = (len(full_binary) // (len(words) - 1)) + 1
-            cover_text = ' '.join(words * multiplier)
-            words = cover_text.split()
+            words = words * multiplier
         
-        # Embed binary in spaces between words
-        stego_text_parts = []
-        bit_index = 0
+        # Embed binary in spaces between words: single space (0) or double space (1),
+        # then normal spaces once the bits run out
+        embedded_bits = full_binary[:len(words) - 1]
+        word_bytes = [word.encode('utf-8') for word in words]
         
-        for i, word in enumerate(words):
-            stego_text_parts.append(word)
-            
-            if i < len(words) - 1 and bit_index < len(full_binary):
-                # Add space based on bit value
-                if full_binary[bit_index] == '0':
-                    stego_text_parts.append(' ')  # Single space
-                else:
-                    stego_text_parts.append('  ')  # Double space
-                bit_index += 1
-            elif i < len(words) - 1:
-                stego_text_parts.append(' ')  # Normal space
+        # Exact output size is known up front, so fill a space-initialised buffer
+        # and only copy the words in
+        total = sum(map(len, word_bytes)) + len(words) - 1 + embedded_bits.count('1')
+        stego_bytes = bytearray(b' ') * total
+        offset = 0
+        for i, word in enumerate(word_bytes):
+            stego_bytes[offset:offset + len(word)] = word
+            offset += len(word) + 1
+            if i < len(embedded_bits) and embedded_bits[i] == '1':
+                offset += 1
         
-        return ''.join(stego_text_parts)
+        return stego_bytes.decode('utf-8')
     
     @staticmethod
     def encode_to_lsb_text(secret_message: str, cover_text: str = None) -> str:
@@ -151,51 +182,47 @@ class TextSteganographyService:
         
         # Base64 encode the secret message first
         message_bytes = secret_message.encode('utf-8')
-        b64_encoded = base64.b64encode(message_bytes).decode('ascii')
+        b64_encoded = base64.b64encode(message_bytes)
         
         # Add length header
         message_length = len(b64_encoded)
-        header = format(message_length, '016b')  # 16-bit length
+        if message_length > 0xFFFF:
+            raise ValueError("Message too long for the 16-bit length header")
         
-        # Convert message to binary
-        binary_message = header + ''.join(format(ord(c), '08b') for c in b64_encoded)
+        # Convert header + message to a 0/1 bit array straight from the bytes,
+        # with no intermediate '0'/'1' string to branch on
+        bits = np.unpackbits(np.frombuffer(message_length.to_bytes(2, 'big') + b64_encoded, dtype=np.uint8))
         
         # Select or use provided cover text
         if not cover_text:
             cover_text = TextSteganographyService.select_cover_text(len(secret_message))
         
-        # Extend cover text if needed by repeating
-        chars_needed = len(binary_message)
-        while len(cover_text) < chars_needed:
-            cover_text += " " + cover_text
+        # Extend cover text if needed by repeating: just enough space-joined copies,
+        # built in one join instead of repeated doubling
+        chars_needed = bits.size
+        if len(cover_text) < chars_needed:
+            repeats = -(-(chars_needed + 1) // (len(cover_text) + 1))
+            cover_text = ' '.join([cover_text] * repeats)
         
-        # Embed binary data in LSB of character codes
-        stego_chars = []
-        for i, bit in enumerate(binary_message):
-            if i < len(cover_text):
-                char_code = ord(cover_text[i])
-                # Modify LSB
-                if bit == '1':
-                    new_code = char_code | 1  # Set LSB to 1
-                else:
-                    new_code = char_code & ~1  # Set LSB to 0
-                
-                # Make sure it's a valid printable character
-                if 32 <= new_code <= 126:
-                    stego_chars.append(chr(new_code))
-                else:
-                    # If modification makes it non-printable, use original + zero-width char
-                    stego_chars.append(cover_text[i])
-                    if bit == '1':
-                        stego_chars.append('\u200B')  # Zero-width space for 1
-            else:
-                break
+        # Embed binary data in LSB of character codes, one branchless vectorized
+        # pass (clear the LSB, OR in the bit) over the code points of the carrier
+        # prefix. The whole text lives in one UTF-32 buffer, so the untouched tail
+        # is never sliced out and concatenated back
+        n = bits.size
+        stego_buffer = bytearray(cover_text.encode('utf-32-le'))
+        stego_codes = np.frombuffer(stego_buffer, dtype=np.uint32)
+        char_codes = stego_codes[:n]
+        new_codes = (char_codes & np.uint32(0xFFFFFFFE)) | bits
         
-        # Add remaining cover text
-        if len(binary_message) < len(cover_text):
-            stego_chars.append(cover_text[len(binary_message):])
+        # Make sure each modified code is a valid printable character; where it
+        # isn't, keep the original and follow it with a zero-width space for a 1
+        printable = (new_codes >= 32) & (new_codes <= 126)
+        zero_width_after = np.flatnonzero(~printable & (bits == 1)) + 1
+        np.copyto(char_codes, new_codes, where=printable)
+        if zero_width_after.size:
+            return np.insert(stego_codes, zero_width_after, np.uint32(0x200B)).tobytes().decode('utf-32-le')
         
-        return ''.join(stego_chars)
+        return stego_buffer.decode('utf-32-le')
     
     @staticmethod
     def decode_from_lsb_text(stego_text: str) -> str:
@@ -203,69 +230,57 @@ class TextSteganographyService:
         import base64
         
         try:
-            print(f"[DEBUG] Decoding LSB text, input length: {len(stego_text)}")
-            
-            # Extract LSB from each character to rebuild binary message
-            binary_bits = []
-            zero_width_count = 0
-            
-            for char in stego_text:
-                if char == '\u200B':  # Zero-width space means 1
-                    zero_width_count += 1
-                    if binary_bits:  # Skip if at start
-                        binary_bits.append('1')
-                    continue
-                
-                char_code = ord(char)
-                # Extract LSB
-                lsb = char_code & 1
-                binary_bits.append(str(lsb))
-            
-            print(f"[DEBUG] Extracted {len(binary_bits)} bits, {zero_width_count} zero-width chars")
-            
-            if len(binary_bits) < 16:
-                print(f"[DEBUG] Not enough bits for header (need 16, got {len(binary_bits)})")
+            logger.debug("Decoding LSB text, input length: %d", len(stego_text))
+            
+            # Each character carries one bit in its LSB. A zero-width space means 1
+            # (its code point is odd, so its LSB already is 1), except before the
+            # first real character
+            carrier = stego_text.lstrip('\u200B')
+            bit_count = len(carrier)
+            if logger.isEnabledFor(logging.DEBUG):
+                # Counting zero-width chars is an extra scan, only worth it for the log
+                logger.debug("Extracted %d bits, %d zero-width chars", bit_count, stego_text.count('\u200B'))
+            
+            if bit_count < 16:
+                logger.debug("Not enough bits for header (need 16, got %d)", bit_count)
                 return ""
             
-            # Extract length from first 16 bits
-            length_binary = ''.join(binary_bits[:16])
-            message_length = int(length_binary, 2)
+            # Extract length from first 16 bits, before touching the rest of the text
+            message_length = 0
+            for char in carrier[:16]:
+                message_length = (message_length << 1) | (ord(char) & 1)
             
-            print(f"[DEBUG] Decoded message length: {message_length}")
+            logger.debug("Decoded message length: %d", message_length)
             
             if message_length <= 0 or message_length > 10000:
-                print(f"[DEBUG] Invalid message length: {message_length}")
+                logger.debug("Invalid message length: %d", message_length)
                 return ""
             
             # Extract message bits (need 8 bits per character)
             total_bits_needed = 16 + (message_length * 8)
-            if len(binary_bits) < total_bits_needed:
-                print(f"[DEBUG] Not enough bits: have {len(binary_bits)}, need {total_bits_needed}")
+            if bit_count < total_bits_needed:
+                logger.debug("Not enough bits: have %d, need %d", bit_count, total_bits_needed)
                 return ""
             
-            # Extract message bits
-            message_bits = binary_bits[16:16 + message_length * 8]
+            # Pack only the payload characters' LSBs, 8 bits to a byte
+            char_codes = np.frombuffer(carrier[16:total_bits_needed].encode('utf-32-le'), dtype=np.uint32)
+            b64_bytes = np.packbits((char_codes & np.uint32(1)).astype(np.uint8)).tobytes()
             
-            # Convert bits to characters
-            b64_chars = []
-            for i in range(0, len(message_bits), 8):
-                byte = ''.join(message_bits[i:i+8])
-                if len(byte) == 8:
-                    b64_chars.append(chr(int(byte, 2)))
-            
-            b64_string = ''.join(b64_chars)
-            print(f"[DEBUG] Base64 string length: {len(b64_string)}")
+            # Message bytes are the base64 characters, handed to b64decode as-is;
+            # non-ASCII means corruption (b64decode would silently skip it)
+            if not b64_bytes.isascii():
+                raise ValueError("Base64 payload contains non-ASCII bytes")
+            logger.debug("Base64 string length: %d", len(b64_bytes))
             
             # Decode from base64
-            decoded_bytes = base64.b64decode(b64_string)
+            decoded_bytes = base64.b64decode(b64_bytes)
             secret_message = decoded_bytes.decode('utf-8')
             
-            print(f"[DEBUG] Successfully decoded message length: {len(secret_message)}")
+            logger.debug("Successfully decoded message length: %d", len(secret_message))
             return secret_message
-        except Exception as e:
-            print(f"[DEBUG] LSB decode error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            # Expected when the text uses another method; extract_message falls back
+            logger.debug("LSB decode failed", exc_info=True)
             return ""
     
     @staticmethod
@@ -305,42 +320,29 @@ class TextSteganographyService:
     def extract_from_whitespace(stego_text: str) -> str:
         """Extract hidden message from whitespace patterns"""
         try:
-            # Extract spacing patterns between words
-            binary_bits = []
-            i = 0
-            while i < len(stego_text):
-                if stego_text[i] == ' ':
-                    # Count consecutive spaces
-                    space_count = 0
-                    while i < len(stego_text) and stego_text[i] == ' ':
-                        space_count += 1
-                        i += 1
-                    
-                    # Single space = 0, double space = 1
-                    if space_count == 1:
-                        binary_bits.append('0')
-                    elif space_count >= 2:
-                        binary_bits.append('1')
-                else:
-                    i += 1
-            
-            if len(binary_bits) < 16:
+            # Extract spacing patterns between words: each run of spaces is one
+            # bit, single space = 0, double (or longer) space = 1. Runs are found
+            # from the rising/falling edges of a vectorized is-space mask
+            is_space = np.frombuffer(stego_text.encode('utf-32-le'), dtype=np.uint32) == 32
+            edges = np.diff(is_space.view(np.int8), prepend=0, append=0)
+            run_lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+            bits = (run_lengths > 1).astype(np.uint8)
+            
+            if bits.size < 16:
                 return ""
             
             # Extract length from first 16 bits
-            length_binary = ''.join(binary_bits[:16])
-            message_length = int(length_binary, 2)
+            message_length = int.from_bytes(np.packbits(bits[:16]).tobytes(), 'big')
             
-            # Extract message bits
-            message_binary = ''.join(binary_bits[16:16 + message_length * 8])
-            
-            # Convert to text
-            secret_message = TextSteganographyService.binary_to_text(message_binary)
+            # Extract message bits, whole bytes only, and convert to text
+            message_bits = bits[16:16 + message_length * 8]
+            message_bits = message_bits[:message_bits.size // 8 * 8]
+            secret_message = np.packbits(message_bits).tobytes().decode('utf-8', errors='replace')
             
             return secret_message
             
-        except Exception as e:
-            print(f"Extraction error: {str(e)}")
+        except Exception:
+            logger.exception("Whitespace extraction failed")
             return ""
     
     @staticmethod
@@ -399,8 +401,8 @@ class TextSteganographyService:
                 return {"success": False, "error": "Cover text is required"}, 400
             
             # Count spaces (each space can encode 1 bit)
-            words = cover_text.split()
-            num_spaces = len(words) - 1
+            word_count = TextSteganographyService._count_words(cover_text)
+            num_spaces = word_count - 1
             
             # Subtract 16 bits for length header
             available_bits = max(0, num_spaces - 16)
@@ -410,7 +412,7 @@ class TextSteganographyService:
                 "success": True,
                 "max_message_length": max_chars,
                 "cover_text_length": len(cover_text),
-                "word_count": len(words),
+                "word_count": word_count,
                 "available_spaces": num_spaces,
                 "capacity_bits": available_bits,
                 "method": "whitespace-steganography",
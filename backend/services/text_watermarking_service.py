@@ -7,6 +7,8 @@ Methods: Zero-width characters, whitespace manipulation, punctuation patterns
 import re
 from typing import Dict, Any, Tuple
 
+from .utils import text_to_binary, binary_to_text
+
 
 class TextWatermarkingService:
     """Service for embedding and extracting watermarks from text"""
@@ -19,22 +21,25 @@ class TextWatermarkingService:
     
     REVERSE_ZERO_WIDTH = {v: k for k, v in ZERO_WIDTH_CHARS.items()}
     
+    # Patterns and tables built once at class load rather than per call
+    _SENTENCE_RE = re.compile(r'([.!?]\s+)')
+    _WATERMARK_RE = re.compile(r'WM:(.*?):WM')
+    _ZERO_WIDTH_RUN_RE = re.compile('[' + ''.join(ZERO_WIDTH_CHARS.values()) + ']+')
+    _ZERO_WIDTH_DELETE = str.maketrans('', '', ''.join(ZERO_WIDTH_CHARS.values()))
+    _ZERO_WIDTH_ENCODE = str.maketrans(ZERO_WIDTH_CHARS)
+    _ZERO_WIDTH_DECODE = str.maketrans(REVERSE_ZERO_WIDTH)
+    
     @staticmethod
     def text_to_binary(text: str) -> str:
         """Convert text to binary string"""
-        return ''.join(format(ord(char), '08b') for char in text)
+        return text_to_binary(text)
     
     @staticmethod
     def binary_to_text(binary: str) -> str:
         """Convert binary string to text"""
         try:
-            chars = []
-            for i in range(0, len(binary), 8):
-                byte = binary[i:i+8]
-                if len(byte) == 8:
-                    chars.append(chr(int(byte, 2)))
-            return ''.join(chars)
-        except:
+            return binary_to_text(binary)
+        except ValueError:
             return ""
     
     @staticmethod
@@ -56,17 +61,13 @@ class TextWatermarkingService:
             # Add delimiter to mark watermark boundaries
             watermark_with_delimiter = f"WM:{watermark}:WM"
             
-            # Convert watermark to binary
+            # Convert watermark to binary (one big-int format) and map the bits to
+            # zero-width characters in a single translate
             binary_watermark = TextWatermarkingService.text_to_binary(watermark_with_delimiter)
-            
-            # Convert binary to zero-width characters
-            zero_width_watermark = ''.join(
-                TextWatermarkingService.ZERO_WIDTH_CHARS[bit] 
-                for bit in binary_watermark
-            )
+            zero_width_watermark = binary_watermark.translate(TextWatermarkingService._ZERO_WIDTH_ENCODE)
             
             # Split text into sentences
-            sentences = re.split(r'([.!?]\s+)', text)
+            sentences = TextWatermarkingService._SENTENCE_RE.split(text)
             
             if len(sentences) == 0:
                 # If no sentences, embed at the beginning
@@ -107,11 +108,9 @@ class TextWatermarkingService:
             if not watermarked_text:
                 return {"success": False, "error": "Watermarked text is required"}, 400
             
-            # Extract zero-width characters
-            zero_width_chars = [
-                char for char in watermarked_text 
-                if char in TextWatermarkingService.REVERSE_ZERO_WIDTH
-            ]
+            # Extract zero-width characters, run by run (the watermark is one contiguous
+            # run, so this is a single C-level scan yielding a handful of strings)
+            zero_width_chars = ''.join(TextWatermarkingService._ZERO_WIDTH_RUN_RE.findall(watermarked_text))
             
             if not zero_width_chars:
                 return {
@@ -121,16 +120,13 @@ class TextWatermarkingService:
                 }, 404
             
             # Convert zero-width characters to binary
-            binary_watermark = ''.join(
-                TextWatermarkingService.REVERSE_ZERO_WIDTH[char] 
-                for char in zero_width_chars
-            )
+            binary_watermark = zero_width_chars.translate(TextWatermarkingService._ZERO_WIDTH_DECODE)
             
             # Convert binary to text
             watermark_with_delimiter = TextWatermarkingService.binary_to_text(binary_watermark)
             
             # Extract watermark between delimiters
-            match = re.search(r'WM:(.*?):WM', watermark_with_delimiter)
+            match = TextWatermarkingService._WATERMARK_RE.search(watermark_with_delimiter)
             
             if match:
                 watermark = match.group(1)
@@ -168,10 +164,7 @@ class TextWatermarkingService:
                 return {"success": False, "error": "Text is required"}, 400
             
             # Remove all zero-width characters
-            clean_text = ''.join(
-                char for char in watermarked_text 
-                if char not in TextWatermarkingService.REVERSE_ZERO_WIDTH
-            )
+            clean_text = watermarked_text.translate(TextWatermarkingService._ZERO_WIDTH_DELETE)
             
             return {
                 "success": True,
@@ -1,17 +1,157 @@
+import functools
+from typing import Union
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 import cv2
 from .utils import (
     create_error_response, create_success_response,
-    image_to_bytes, file_to_image, save_temp_image
+    image_to_bytes, file_to_image, file_to_rgba_image, save_temp_image, text_to_bits
 )
 
+# zlib level for watermarked PNGs: served transiently, so favour encode speed
+PNG_COMPRESS_LEVEL = 1
+
+# Visible watermark placement: position -> (image w, h, mark w, h) -> top-left
+# corner, 20px in from the edges; shared by the text and image methods
+WATERMARK_POSITIONS = {
+    'top-left': lambda iw, ih, w, h: (20, 20),
+    'top-right': lambda iw, ih, w, h: (iw - w - 20, 20),
+    'bottom-left': lambda iw, ih, w, h: (20, ih - h - 20),
+    'bottom-right': lambda iw, ih, w, h: (iw - w - 20, ih - h - 20),
+    'center': lambda iw, ih, w, h: ((iw - w) // 2, (ih - h) // 2),
+}
+
+# Text watermark colour names -> RGB
+WATERMARK_COLORS = {
+    'white': (255, 255, 255),
+    'black': (0, 0, 0),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'yellow': (255, 255, 0),
+    'cyan': (0, 255, 255),
+    'magenta': (255, 0, 255),
+}
+
+# Every byte outside printable ASCII (32-126), deleted from extracted watermarks
+NON_PRINTABLE_BYTES = bytes(code for code in range(256) if not 32 <= code <= 126)
+
+# Invisible watermarks only use DCT coefficients below this row/column index
+DCT_BAND_LIMIT = 100
+
+@functools.lru_cache(maxsize=32)
+def _load_watermark_font(font_size: int):
+    """Arial at font_size, else Pillow's built-in font, else None; resolved once per size"""
+    try:
+        return ImageFont.truetype("arial.ttf", font_size)
+    except Exception:
+        try:
+            return ImageFont.load_default()
+        except Exception:
+            return None
+
+@functools.lru_cache(maxsize=16)
+def _dct_basis(length: int, count: int) -> np.ndarray:
+    """First `count` rows of the orthonormal DCT-II matrix for `length` samples (cv2.dct's scaling)"""
+    basis = np.cos(np.pi * np.outer(np.arange(count), 2 * np.arange(length) + 1) / (2 * length))
+    basis *= np.sqrt(2 / length)
+    basis[:1] = np.sqrt(1 / length)
+    basis = basis.astype(np.float32)
+    basis.setflags(write=False)
+    return basis
+
+@functools.lru_cache(maxsize=64)
+def _dct_band_positions(row_span: int, col_span: int):
+    """Read-only row/column indices of every watermark slot in a band, row by row; built once per band size"""
+    rows_idx, cols_idx = (axis.ravel() for axis in np.indices((row_span, col_span)) + 1)
+    rows_idx.setflags(write=False)
+    cols_idx.setflags(write=False)
+    return rows_idx, cols_idx
+
 class WatermarkingService:
     """Service for image watermarking operations"""
     
+    @staticmethod
+    def _div255(values: np.ndarray) -> np.ndarray:
+        """Rounded division by 255 as Pillow's blends do it, on uint32 products"""
+        values = values + 128
+        return ((values + (values >> 8)) >> 8).astype(np.uint8)
+    
+    @staticmethod
+    def _flatten_on_white(image: Union[Image.Image, np.ndarray], keep_alpha: bool = False) -> Image.Image:
+        """
+        Flatten an RGBA image (or H x W x 4 array) onto a white background in a single pass
+        
+        Same result as pasting it onto a white RGB canvas with its alpha as mask
+        (Pillow's rounded divide-by-255 blend), without the canvas, split or paste.
+        With keep_alpha, translucent images are returned as RGBA instead (PNG output
+        carries the alpha itself); opaque ones are always returned as RGB
+        """
+        rgba = np.asarray(image)
+        alpha = rgba[..., 3:]
+        if alpha.min() == 255:
+            # Fully opaque (e.g. an RGB source): flattening just drops alpha
+            return Image.fromarray(rgba, 'RGBA').convert('RGB')
+        
+        if keep_alpha:
+            return image if isinstance(image, Image.Image) else Image.fromarray(rgba, 'RGBA')
+        
+        alpha = alpha.astype(np.uint32)
+        return Image.fromarray(WatermarkingService._div255(rgba[..., :3] * alpha + 255 * (255 - alpha)), 'RGB')
+    
+    @staticmethod
+    def _paste_blend(base: np.ndarray, overlay: np.ndarray, x: int, y: int) -> None:
+        """
+        Alpha-blend an RGBA overlay onto an RGBA base array in place, clipped to the base
+        
+        Colour matches Image.paste(overlay, (x, y), overlay); alpha uses the "over"
+        rule of Image.alpha_composite, so an opaque base stays opaque. Only the
+        overlapping region is touched, once
+        """
+        height, width = overlay.shape[:2]
+        top, left = max(y, 0), max(x, 0)
+        bottom, right = min(y + height, base.shape[0]), min(x + width, base.shape[1])
+        if top >= bottom or left >= right:
+            return
+        
+        roi = base[top:bottom, left:right]
+        source = overlay[top - y:bottom - y, left - x:right - x]
+        mask = source[..., 3:].astype(np.uint32)
+        roi[..., :3] = WatermarkingService._div255(source[..., :3] * mask + roi[..., :3] * (255 - mask))
+        roi[..., 3:] = WatermarkingService._div255(mask * 255 + roi[..., 3:] * (255 - mask))
+    
+    @staticmethod
+    def _dct_bases(shape):
+        """
+        Row and column DCT bases spanning the low-frequency band watermarks use
+        
+        row_basis @ y @ col_basis.T equals the top-left corner of cv2.dct(y), at
+        O(band * pixels) instead of a full-image transform
+        """
+        rows, cols = shape
+        return (_dct_basis(rows, min(rows // 2, DCT_BAND_LIMIT)),
+                _dct_basis(cols, min(cols // 2, DCT_BAND_LIMIT)))
+    
+    @staticmethod
+    def _dct_positions(shape, count: int):
+        """
+        Row/column index arrays of the DCT coefficients carrying invisible watermark bits
+        
+        Walks rows 1..min(rows//2, 100)-1 and, within each, columns 1..min(cols//2, 100)-1
+        (skipping the DC row/column and high frequencies), returning at most `count` positions
+        """
+        rows, cols = shape
+        max_range_i = min(rows // 2, DCT_BAND_LIMIT)
+        max_range_j = min(cols // 2, DCT_BAND_LIMIT)
+        row_span, col_span = max(max_range_i - 1, 0), max(max_range_j - 1, 0)
+        
+        rows_idx, cols_idx = _dct_band_positions(row_span, col_span)
+        return rows_idx[:count], cols_idx[:count]
+    
     @staticmethod
     def add_text_watermark(image_file, watermark_text: str, opacity: float = 0.5, 
-                          position: str = 'bottom-right', font_size: int = 36, color: str = 'white'):
+                          position: str = 'bottom-right', font_size: int = 36, color: str = 'white',
+                          return_image: bool = False):
         """
         Add text watermark to an image
         
@@ -22,6 +162,7 @@ class WatermarkingService:
             position: Watermark position ('top-left', 'top-right', 'bottom-left', 'bottom-right', 'center')
             font_size: Font size for the watermark
             color: Text color ('white', 'black', 'red', 'blue', etc.)
+            return_image: Return the PIL Image instead of PNG bytes (for in-process pipelines)
         
         Returns:
             Tuple of (result_dict, status_code)
@@ -32,7 +173,7 @@ class WatermarkingService:
             
             # Load image
             if hasattr(image_file, 'stream'):
-                image = file_to_image(image_file)
+                image = file_to_rgba_image(image_file)
             else:
                 image = image_file
             
@@ -40,18 +181,22 @@ class WatermarkingService:
             if image.mode != 'RGBA':
                 image = image.convert('RGBA')
             
-            # Create transparent overlay
-            overlay = Image.new('RGBA', image.size, (255, 255, 255, 0))
-            draw = ImageDraw.Draw(overlay)
+            # Fully opaque text on an opaque image can be drawn straight onto it (same
+            # pixels as compositing); otherwise draw on a transparent overlay
+            alpha = int(opacity * 255)
+            if alpha == 255 and image.getchannel('A').getextrema()[0] == 255:
+                if image is image_file:
+                    # Never draw on the caller's image
+                    image = image.copy()
+                overlay = None
+                draw = ImageDraw.Draw(image)
+            else:
+                # Create transparent overlay
+                overlay = Image.new('RGBA', image.size, (255, 255, 255, 0))
+                draw = ImageDraw.Draw(overlay)
             
-            # Try to use a default font, fallback to built-in font
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.load_default()
-                except:
-                    font = None
+            # Try to use a default font, fallback to built-in font (cached per size)
+            font = _load_watermark_font(font_size)
             
             # Get text dimensions
             if font:
@@ -66,52 +211,27 @@ class WatermarkingService:
             # Calculate position
             img_width, img_height = image.size
             
-            position_map = {
-                'top-left': (20, 20),
-                'top-right': (img_width - text_width - 20, 20),
-                'bottom-left': (20, img_height - text_height - 20),
-                'bottom-right': (img_width - text_width - 20, img_height - text_height - 20),
-                'center': ((img_width - text_width) // 2, (img_height - text_height) // 2)
-            }
-            
-            if position not in position_map:
+            if position not in WATERMARK_POSITIONS:
                 return create_error_response("Invalid position. Use: top-left, top-right, bottom-left, bottom-right, center")
             
-            x, y = position_map[position]
-            
-            # Color mapping
-            color_map = {
-                'white': (255, 255, 255),
-                'black': (0, 0, 0),
-                'red': (255, 0, 0),
-                'green': (0, 255, 0),
-                'blue': (0, 0, 255),
-                'yellow': (255, 255, 0),
-                'cyan': (0, 255, 255),
-                'magenta': (255, 0, 255)
-            }
-            
-            text_color = color_map.get(color.lower(), (255, 255, 255))
-            alpha = int(opacity * 255)
-            text_color_with_alpha = text_color + (alpha,)
+            x, y = WATERMARK_POSITIONS[position](img_width, img_height, text_width, text_height)
+            
+            # Color mapping (unknown names fall back to white)
+            text_color_with_alpha = (*WATERMARK_COLORS.get(color.lower(), WATERMARK_COLORS['white']), alpha)
             
             # Draw text
             draw.text((x, y), watermark_text, fill=text_color_with_alpha, font=font)
             
             # Composite the overlay onto the original image
-            watermarked = Image.alpha_composite(image, overlay)
+            watermarked = image if overlay is None else Image.alpha_composite(image, overlay)
             
-            # Convert back to RGB if needed
+            # Convert back to RGB if needed; PNG output keeps any translucency
+            # as alpha, only in-process callers get it flattened onto white
             if watermarked.mode == 'RGBA':
-                background = Image.new('RGB', watermarked.size, (255, 255, 255))
-                background.paste(watermarked, mask=watermarked.split()[-1])
-                watermarked = background
-            
-            # Convert to bytes
-            watermarked_bytes = image_to_bytes(watermarked, 'PNG')
+                watermarked = WatermarkingService._flatten_on_white(watermarked, keep_alpha=not return_image)
             
             return create_success_response({
-                "watermarked_image": watermarked_bytes,
+                "watermarked_image": watermarked if return_image else image_to_bytes(watermarked, 'PNG', compress_level=PNG_COMPRESS_LEVEL),
                 "watermark_text": watermark_text,
                 "opacity": opacity,
                 "position": position,
@@ -142,12 +262,12 @@ class WatermarkingService:
         try:
             # Load images
             if hasattr(base_image_file, 'stream'):
-                base_image = file_to_image(base_image_file)
+                base_image = file_to_rgba_image(base_image_file)
             else:
                 base_image = base_image_file
             
             if hasattr(watermark_image_file, 'stream'):
-                watermark_image = file_to_image(watermark_image_file)
+                watermark_image = file_to_rgba_image(watermark_image_file)
             else:
                 watermark_image = watermark_image_file
             
@@ -169,40 +289,36 @@ class WatermarkingService:
             else:
                 watermark_height = int(watermark_width / watermark_ratio)
             
-            watermark_resized = watermark_image.resize((watermark_width, watermark_height), Image.Resampling.LANCZOS)
+            # Bilinear (area-aware in Pillow) is indistinguishable from Lanczos when
+            # shrinking to a thumbnail at half the cost; keep Lanczos for enlarging
+            if watermark_width <= watermark_image.width and watermark_height <= watermark_image.height:
+                resample = Image.Resampling.BILINEAR
+            else:
+                resample = Image.Resampling.LANCZOS
+            watermark_resized = watermark_image.resize((watermark_width, watermark_height), resample)
             
             # Calculate position
-            position_map = {
-                'top-left': (20, 20),
-                'top-right': (base_width - watermark_width - 20, 20),
-                'bottom-left': (20, base_height - watermark_height - 20),
-                'bottom-right': (base_width - watermark_width - 20, base_height - watermark_height - 20),
-                'center': ((base_width - watermark_width) // 2, (base_height - watermark_height) // 2)
-            }
-            
-            if position not in position_map:
+            if position not in WATERMARK_POSITIONS:
                 return create_error_response("Invalid position. Use: top-left, top-right, bottom-left, bottom-right, center")
             
-            x, y = position_map[position]
+            x, y = WATERMARK_POSITIONS[position](base_width, base_height, watermark_width, watermark_height)
             
-            # Apply opacity to watermark
-            watermark_with_opacity = watermark_resized.copy()
-            alpha = watermark_with_opacity.split()[-1]
-            alpha = alpha.point(lambda p: int(p * opacity))
-            watermark_with_opacity.putalpha(alpha)
+            # Apply opacity to watermark: scale alpha through a 256-entry LUT
+            opacity_lut = np.clip(np.arange(256) * opacity, 0, 255).astype(np.uint8)
+            watermark_pixels = np.array(watermark_resized)
+            watermark_pixels[..., 3] = opacity_lut[watermark_pixels[..., 3]]
             
-            # Paste watermark onto base image
-            result_image = base_image.copy()
-            result_image.paste(watermark_with_opacity, (x, y), watermark_with_opacity)
+            # Paste watermark onto (a copy of) the base image, blending only the
+            # region it covers
+            result_pixels = np.array(base_image)
+            WatermarkingService._paste_blend(result_pixels, watermark_pixels, x, y)
             
-            # Convert back to RGB if needed
-            if result_image.mode == 'RGBA':
-                background = Image.new('RGB', result_image.size, (255, 255, 255))
-                background.paste(result_image, mask=result_image.split()[-1])
-                result_image = background
+            # Convert back to RGB straight from the blended array (translucent
+            # results stay RGBA, which the PNG output carries as is)
+            result_image = WatermarkingService._flatten_on_white(result_pixels, keep_alpha=True)
             
             # Convert to bytes
-            watermarked_bytes = image_to_bytes(result_image, 'PNG')
+            watermarked_bytes = image_to_bytes(result_image, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
             
             return create_success_response({
                 "watermarked_image": watermarked_bytes,
@@ -218,7 +334,7 @@ class WatermarkingService:
             return create_error_response(f"Image watermarking failed: {str(e)}")
     
     @staticmethod
-    def add_invisible_watermark(image_file, watermark_text: str, strength: float = 0.1):
+    def add_invisible_watermark(image_file, watermark_text: str, strength: float = 0.1, return_image: bool = False):
         """
         Add invisible watermark using frequency domain manipulation
         
@@ -226,6 +342,7 @@ class WatermarkingService:
             image_file: Image file (FileStorage or PIL Image)
             watermark_text: Text to embed as invisible watermark
             strength: Watermark strength (0.01 to 1.0)
+            return_image: Return the PIL Image instead of PNG bytes (for in-process pipelines)
         
         Returns:
             Tuple of (result_dict, status_code)
@@ -244,78 +361,70 @@ class WatermarkingService:
             if image.mode != 'RGB':
                 image = image.convert('RGB')
             
-            # Convert to numpy array
-            img_array = np.array(image)
+            # View the pixels as a numpy array (cvtColor writes a new buffer anyway)
+            img_array = np.asarray(image)
             
-            # Convert to YUV color space (watermark in luminance channel)
+            # Convert to YUV color space (watermark in luminance channel); only
+            # luma goes through float32, chroma stays uint8 in img_yuv
             img_yuv = cv2.cvtColor(img_array, cv2.COLOR_RGB2YUV)
             y_channel = img_yuv[:, :, 0].astype(np.float32)
             
-            # Apply DCT (Discrete Cosine Transform)
-            dct_coeffs = cv2.dct(y_channel)
+            # Apply DCT (Discrete Cosine Transform), computing only the low-frequency
+            # corner that can carry watermark bits
+            row_basis, col_basis = WatermarkingService._dct_bases(y_channel.shape)
+            dct_coeffs = row_basis @ y_channel @ col_basis.T
             
-            # Create watermark pattern from text
-            watermark_binary = ''.join(format(ord(char), '08b') for char in watermark_text)
+            # Create watermark pattern from text, as a 0/1 bit array
+            watermark_bits = text_to_bits(watermark_text)
             
             # Embed watermark in mid-frequency coefficients
-            rows, cols = dct_coeffs.shape
-            watermark_length = len(watermark_binary)
+            watermark_length = watermark_bits.size
             
             # Select positions for embedding (avoiding DC and high-frequency components)
             # Use more of the coefficient space to support longer watermarks
-            positions = []
-            max_range_i = min(rows//2, 100)  # Use up to 100 rows
-            max_range_j = min(cols//2, 100)  # Use up to 100 cols
-            
-            for i in range(1, max_range_i):
-                for j in range(1, max_range_j):
-                    if len(positions) < watermark_length:
-                        positions.append((i, j))
-                    else:
-                        break
-                if len(positions) >= watermark_length:
-                    break
-            
-            if len(positions) < watermark_length:
+            rows_idx, cols_idx = WatermarkingService._dct_positions(y_channel.shape, watermark_length)
+            num_positions = rows_idx.size
+            
+            if num_positions < watermark_length:
                 # Truncate watermark text if image is too small
-                max_chars = len(positions) // 8
+                max_chars = num_positions // 8
                 if max_chars < 3:
                     return create_error_response(f"Image too small. Minimum size: 100x100 pixels. Current: {image.width}x{image.height}")
                 
                 # Truncate the watermark text
                 watermark_text = watermark_text[:max_chars]
-                watermark_binary = ''.join(format(ord(char), '08b') for char in watermark_text)
-                watermark_length = len(watermark_binary)
+                watermark_bits = text_to_bits(watermark_text)
+                watermark_length = watermark_bits.size
                 print(f"[WARNING] Watermark truncated to {max_chars} characters to fit image")
             
-            # Embed watermark bits
-            for idx, bit in enumerate(watermark_binary):
-                if idx < len(positions):
-                    i, j = positions[idx]
-                    if bit == '1':
-                        dct_coeffs[i, j] += strength * abs(dct_coeffs[i, j])
-                    else:
-                        dct_coeffs[i, j] -= strength * abs(dct_coeffs[i, j])
+            # Embed watermark bits: push each coefficient up (1) or down (0) by
+            # strength * |coefficient|, all positions in one fancy-indexed update
+            # (bits and positions paired up to the shorter of the two)
+            rows_idx, cols_idx = rows_idx[:watermark_length], cols_idx[:watermark_length]
+            signs = np.where(watermark_bits[:rows_idx.size] == 1, strength, -strength).astype(np.float32)
+            dct_delta = np.zeros_like(dct_coeffs)
+            dct_delta[rows_idx, cols_idx] = signs * np.abs(dct_coeffs[rows_idx, cols_idx])
             
-            # Apply inverse DCT
-            watermarked_y = cv2.idct(dct_coeffs)
-            watermarked_y = np.clip(watermarked_y, 0, 255).astype(np.uint8)
+            # Apply inverse DCT: the transform is linear and only the corner changed,
+            # so add the inverse of the coefficient delta back onto the luma plane
+            watermarked_y = y_channel
+            watermarked_y += row_basis.T @ (dct_delta @ col_basis)
             
-            # Reconstruct image
-            img_yuv[:, :, 0] = watermarked_y
-            watermarked_rgb = cv2.cvtColor(img_yuv, cv2.COLOR_YUV2RGB)
+            # Clip in place and truncate straight into the luma plane
+            np.clip(watermarked_y, 0, 255, out=watermarked_y)
+            np.copyto(img_yuv[:, :, 0], watermarked_y, casting='unsafe')
             
-            # Convert back to PIL Image
-            watermarked_image = Image.fromarray(watermarked_rgb)
+            # Reconstruct image (per-pixel conversion, so it can run in place)
+            watermarked_rgb = cv2.cvtColor(img_yuv, cv2.COLOR_YUV2RGB, dst=img_yuv)
             
-            # Convert to bytes
-            watermarked_bytes = image_to_bytes(watermarked_image, 'PNG')
+            # Convert back to PIL Image straight from the array's buffer
+            watermarked_image = Image.frombytes('RGB', image.size, memoryview(watermarked_rgb))
             
             return create_success_response({
-                "watermarked_image": watermarked_bytes,
+                "watermarked_image": watermarked_image if return_image else image_to_bytes(watermarked_image, 'PNG', compress_level=PNG_COMPRESS_LEVEL),
                 "watermark_text": watermark_text,
                 "strength": strength,
-                "embedding_positions": len(positions),
+                "embedding_positions": num_positions,
                 "format": "PNG",
                 "type": "invisible"
             })
@@ -348,66 +457,41 @@ class WatermarkingService:
                 image = image.convert('RGB')
             
             # Convert to numpy array
-            img_array = np.array(image)
+            img_array = np.asarray(image)
             
             # Convert to YUV color space
             img_yuv = cv2.cvtColor(img_array, cv2.COLOR_RGB2YUV)
             y_channel = img_yuv[:, :, 0].astype(np.float32)
             
-            # Apply DCT
-            dct_coeffs = cv2.dct(y_channel)
+            # Apply DCT to the low-frequency corner holding the watermark
+            row_basis, col_basis = WatermarkingService._dct_bases(y_channel.shape)
+            dct_coeffs = row_basis @ y_channel @ col_basis.T
             
             # Calculate expected watermark bit length
             watermark_bits = watermark_length * 8
             
             # Get the same positions used for embedding (must match embedding algorithm)
-            rows, cols = dct_coeffs.shape
-            positions = []
-            max_range_i = min(rows//2, 100)  # Match embedding range
-            max_range_j = min(cols//2, 100)  # Match embedding range
-            
-            for i in range(1, max_range_i):
-                for j in range(1, max_range_j):
-                    if len(positions) < watermark_bits:
-                        positions.append((i, j))
-                    else:
-                        break
-                if len(positions) >= watermark_bits:
-                    break
-            
-            if len(positions) < watermark_bits:
+            rows_idx, cols_idx = WatermarkingService._dct_positions(y_channel.shape, watermark_bits)
+            
+            if rows_idx.size < watermark_bits:
                 # Extract what we can
-                watermark_bits = len(positions)
+                watermark_bits = rows_idx.size
                 watermark_length = watermark_bits // 8
                 print(f"[WARNING] Can only extract {watermark_length} characters from this image")
             
-            # Extract watermark bits (this is a simplified extraction)
-            extracted_bits = []
-            for idx in range(watermark_bits):
-                if idx < len(positions):
-                    i, j = positions[idx]
-                    # Simple threshold-based extraction
-                    if dct_coeffs[i, j] > 0:
-                        extracted_bits.append('1')
-                    else:
-                        extracted_bits.append('0')
-            
-            # Convert bits to text
-            extracted_text = ""
-            for i in range(0, len(extracted_bits), 8):
-                byte_bits = ''.join(extracted_bits[i:i+8])
-                if len(byte_bits) == 8:
-                    try:
-                        char_code = int(byte_bits, 2)
-                        if 32 <= char_code <= 126:  # Printable ASCII
-                            extracted_text += chr(char_code)
-                    except ValueError:
-                        continue
+            # Extract watermark bits (this is a simplified extraction):
+            # simple threshold on the sign of each coefficient
+            extracted_bits = (dct_coeffs[rows_idx, cols_idx] > 0).astype(np.uint8)
+            
+            # Convert whole bytes to text, keeping printable ASCII only (one C-level
+            # delete pass, so the decode cannot fail)
+            extracted_bytes = np.packbits(extracted_bits[:extracted_bits.size // 8 * 8]).tobytes()
+            extracted_text = extracted_bytes.translate(None, NON_PRINTABLE_BYTES).decode('ascii')
             
             return create_success_response({
                 "extracted_text": extracted_text,
                 "confidence": "low",  # Simple extraction has low confidence
-                "extracted_bits": len(extracted_bits),
+                "extracted_bits": int(extracted_bits.size),
                 "note": "Invisible watermark extraction is approximate and may not be fully accurate"
             })
         